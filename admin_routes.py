@@ -1,397 +1,56 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
-from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_sqlalchemy import SQLAlchemy
+from flask import Blueprint, Response, render_template, request, redirect, url_for, flash, jsonify, stream_with_context
+from flask_login import login_user, login_required, current_user
+from werkzeug.security import check_password_hash
 from datetime import datetime, timedelta
-import random
-import os
-
-# Database initialization
-db = SQLAlchemy()
-
-class User(UserMixin, db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(100), unique=True, nullable=False)
-    password_hash = db.Column(db.String(200), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    is_admin = db.Column(db.Boolean, default=False)
-    
-    def __repr__(self):
-        return f'<User {self.name}>'
-
-class EcoPoint(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    date = db.Column(db.Date, default=datetime.utcnow)
-    points = db.Column(db.Integer, default=0)
-    task_type = db.Column(db.String(50), nullable=False)
-    description = db.Column(db.String(200))
-    
-    @staticmethod
-    def get_user_total_points(user_id):
-        result = db.session.query(db.func.sum(EcoPoint.points)).filter(
-            EcoPoint.user_id == user_id
-        ).scalar()
-        return result if result else 0
-    
-    def __repr__(self):
-        return f'<EcoPoint {self.points} - {self.date}>'
-
-class Badge(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    badge_name = db.Column(db.String(100), nullable=False)
-    badge_description = db.Column(db.String(200))
-    earned_date = db.Column(db.Date, default=datetime.utcnow)
-    badge_icon = db.Column(db.String(50), default='🛡️')
-    
-    @staticmethod
-    def assign_badge(user_id, total_points):
-        badges = {
-            50: {"name": "Green Starter", "description": "Yashil yo'l boshlovchisi", "icon": "🌱"},
-            100: {"name": "Eco Friend", "description": "Tabiat do'sti", "icon": "🤝"},
-            200: {"name": "Nature Guardian", "description": "Tabiat himoyachisi", "icon": "🛡️"},
-            500: {"name": "Planet Hero", "description": "Sayyora qahramoni", "icon": "🦸"},
-            1000: {"name": "Eco Master", "description": "Ekologiya ustasi", "icon": "🏆"}
-        }
-        
-        earned_badge = None
-        
-        for points, badge_info in badges.items():
-            if total_points >= points:
-                existing_badge = Badge.query.filter_by(
-                    user_id=user_id, 
-                    badge_name=badge_info["name"]
-                ).first()
-                
-                if not existing_badge:
-                    new_badge = Badge(
-                        user_id=user_id,
-                        badge_name=badge_info["name"],
-                        badge_description=badge_info["description"],
-                        badge_icon=badge_info["icon"]
-                    )
-                    db.session.add(new_badge)
-                    db.session.commit()
-                    earned_badge = badge_info["name"]
-        
-        return earned_badge
-
-class Tip(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    text = db.Column(db.Text, nullable=False)
-    category = db.Column(db.String(50), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    @staticmethod
-    def get_random_tip():
-        tips = Tip.query.all()
-        return random.choice(tips).text if tips else "Tabiatni seving! 🌍"
-
-# Blog Modellari
-class BlogPost(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    title = db.Column(db.String(200), nullable=False)
-    content = db.Column(db.Text, nullable=False)
-    author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    is_published = db.Column(db.Boolean, default=True)
-    
-    # Relationships
-    author = db.relationship('User', backref='posts')
-    likes = db.relationship('PostLike', backref='post', lazy=True, cascade='all, delete-orphan')
-    comments = db.relationship('PostComment', backref='post', lazy=True, cascade='all, delete-orphan')
-    
-    def __repr__(self):
-        return f'<BlogPost {self.title}>'
-
-class PostLike(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    post_id = db.Column(db.Integer, db.ForeignKey('blog_post.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    def __repr__(self):
-        return f'<PostLike user:{self.user_id} post:{self.post_id}>'
-
-class PostComment(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    content = db.Column(db.Text, nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    post_id = db.Column(db.Integer, db.ForeignKey('blog_post.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    is_approved = db.Column(db.Boolean, default=True)
-    
-    # Relationships
-    user = db.relationship('User', backref='comments')
-    
-    def __repr__(self):
-        return f'<PostComment {self.content[:50]}...>'
-
-# Quiz Modellari
-class Quiz(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    title = db.Column(db.String(200), nullable=False)
-    description = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    is_active = db.Column(db.Boolean, default=True)
-    
-    # Relationships
-    questions = db.relationship('QuizQuestion', backref='quiz', lazy=True, cascade='all, delete-orphan')
-    
-    def __repr__(self):
-        return f'<Quiz {self.title}>'
-
-class QuizQuestion(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
-    question_text = db.Column(db.Text, nullable=False)
-    option_a = db.Column(db.String(200))
-    option_b = db.Column(db.String(200))
-    option_c = db.Column(db.String(200))
-    option_d = db.Column(db.String(200))
-    correct_answer = db.Column(db.String(1))  # 'A', 'B', 'C', 'D'
-    points = db.Column(db.Integer, default=1)
-    
-    def __repr__(self):
-        return f'<QuizQuestion {self.question_text[:50]}...>'
-
-# Flask app initialization
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'eco-track-secret-key-2024'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///eco.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-db.init_app(app)
-
-login_manager = LoginManager()
-login_manager.init_app(app)
-login_manager.login_view = 'login'
-login_manager.login_message = 'Iltimos, tizimga kiring!'
-
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
-
-def create_admin_user():
-    """Admin foydalanuvchi yaratish (agar mavjud bo'lmasa)"""
-    admin_email = "admin@ecotrack.com"
-    admin_user = User.query.filter_by(email=admin_email).first()
-    
-    if not admin_user:
-        admin_password = generate_password_hash("admin123")
-        new_admin = User(
-            name="EcoTrack Admin",
-            email=admin_email,
-            password_hash=admin_password,
-            is_admin=True
-        )
-        db.session.add(new_admin)
-        db.session.commit()
-        print("✅ Admin foydalanuvchi yaratildi:")
-        print("   Email: admin@ecotrack.com")
-        print("   Parol: admin123")
-
-def init_db():
-    with app.app_context():
-        # Create tables
-        db.create_all()
-        
-        # Admin foydalanuvchi yaratish
-        create_admin_user()
-        
-        # Add initial tips if empty
-        if Tip.query.count() == 0:
-            tips_data = [
-                {"text": "Bugun plastik ishlatmang 🌿", "category": "daily"},
-                {"text": "Daraxt eking 🌳", "category": "action"},
-                {"text": "Yorug'likni tejang 💡", "category": "energy"},
-                {"text": "Suvni tejang 💧", "category": "water"},
-                {"text": "Qayta ishlang ♻️", "category": "recycle"},
-                {"text": "Velosiped haydang 🚲", "category": "transport"},
-                {"text": "Mahalliy mahsulotlar sotib oling 🍎", "category": "shopping"},
-                {"text": "Kompost qiling 🍂", "category": "waste"},
-            ]
-            
-            for tip_info in tips_data:
-                tip = Tip(text=tip_info["text"], category=tip_info["category"])
-                db.session.add(tip)
-            
-            db.session.commit()
-            print("✅ Database initialized with sample data")
-
-def calculate_environmental_impact(points):
-    """Calculate environmental impact based on points"""
-    return {
-        'co2_saved': round(points * 0.2, 1),
-        'water_saved': points * 1.5,
-        'plastic_saved': round(points * 0.1, 1),
-        'energy_saved': points * 0.5
-    }
-
-def get_impact_comparisons(impact):
-    """Get environmental impact comparisons"""
-    return {
-        'co2_car_km': round(impact['co2_saved'] / 0.404, 1) if impact['co2_saved'] > 0 else 0,
-        'water_showers': round(impact['water_saved'] / 65) if impact['water_saved'] > 0 else 0,
-        'plastic_bottles': round(impact['plastic_saved'] / 0.05) if impact['plastic_saved'] > 0 else 0,
-        'energy_homes': round(impact['energy_saved'] / 30) if impact['energy_saved'] > 0 else 0
-    }
-
-def get_next_badge_info(total_points):
-    """Get information about the next badge to earn"""
-    badges = [
-        {"points": 50, "name": "Green Starter", "description": "Yashil yo'l boshlovchisi", "icon": "🌱"},
-        {"points": 100, "name": "Eco Friend", "description": "Tabiat do'sti", "icon": "🤝"},
-        {"points": 200, "name": "Nature Guardian", "description": "Tabiat himoyachisi", "icon": "🛡️"},
-        {"points": 500, "name": "Planet Hero", "description": "Sayyora qahramoni", "icon": "🦸"},
-        {"points": 1000, "name": "Eco Master", "description": "Ekologiya ustasi", "icon": "🏆"}
-    ]
-    
-    # Find current and next badge
-    current_badge = badges[0]
-    next_badge = badges[1] if len(badges) > 1 else badges[0]
-    
-    for i, badge in enumerate(badges):
-        if total_points >= badge['points']:
-            current_badge = badge
-            if i + 1 < len(badges):
-                next_badge = badges[i + 1]
-            else:
-                # If it's the last badge, show current one as next (completed)
-                next_badge = badge
-    
-    # Calculate progress to next badge
-    progress = 0
-    if next_badge['points'] > current_badge['points']:
-        progress = ((total_points - current_badge['points']) / 
-                   (next_badge['points'] - current_badge['points'])) * 100
-    else:
-        progress = 100  # All badges earned
-    
-    return {
-        'name': next_badge['name'],
-        'description': next_badge['description'],
-        'icon': next_badge['icon'],
-        'current': total_points,
-        'required': next_badge['points'],
-        'progress': min(100, progress)
+import csv
+import io
+import json
+
+from cache import cache
+from models import db, read_replica, User, EcoPoint, BlogPost, PostComment, DailyRollup, Quiz
+from utils import keyset_paginate, approximate_count, ADMIN_PAGE_SIZE
+
+admin_bp = Blueprint('admin', __name__)
+
+# Admin dashboard statistikasi keshi (TTL; 'quizzes' tegi yangi quizda bekor qilinadi)
+ADMIN_STATS_TTL = 30
+
+# Moderatsiya navbati filtrlari (PostComment.moderation_filter holatlari)
+COMMENT_STATUSES = ('pending', 'approved', 'rejected', 'all')
+
+# Admin eksportlari: ustunlar, sana ustuni va foydalanuvchi ustuni
+EXPORT_CHUNK_SIZE = 1000
+EXPORTS = {
+    'eco-points': {
+        'columns': [EcoPoint.id, EcoPoint.user_id, EcoPoint.date, EcoPoint.task_type,
+                    EcoPoint.points, EcoPoint.description],
+        'date_column': EcoPoint.date,
+        'user_column': EcoPoint.user_id
+    },
+    'users': {
+        'columns': [User.id, User.name, User.email, User.created_at, User.is_admin],
+        'date_column': User.created_at,
+        'user_column': User.id
+    },
+    'posts': {
+        'columns': [BlogPost.id, BlogPost.author_id, BlogPost.title, BlogPost.created_at,
+                    BlogPost.updated_at, BlogPost.is_published, BlogPost.like_count],
+        'date_column': BlogPost.created_at,
+        'user_column': BlogPost.author_id
+    },
+    'comments': {
+        'columns': [PostComment.id, PostComment.post_id, PostComment.user_id, PostComment.content,
+                    PostComment.created_at, PostComment.is_approved, PostComment.is_rejected],
+        'date_column': PostComment.created_at,
+        'user_column': PostComment.user_id
     }
+}
 
-# ===== BLOG ROUTES =====
-@app.route('/blog')
-def blog_index():
-    """Blog asosiy sahifasi"""
-    page = request.args.get('page', 1, type=int)
-    posts = BlogPost.query.filter_by(is_published=True)\
-        .order_by(BlogPost.created_at.desc())\
-        .paginate(page=page, per_page=6)
-    return render_template('blog/blog.html', posts=posts)
-
-@app.route('/blog/post/<int:post_id>')
-def blog_post(post_id):
-    """Blog post sahifasi"""
-    post = BlogPost.query.get_or_404(post_id)
-    return render_template('blog/blog_post.html', post=post)
-
-@app.route('/blog/create', methods=['GET', 'POST'])
-@login_required
-def blog_create():
-    """Yangi post yaratish"""
-    if request.method == 'POST':
-        try:
-            title = request.form.get('title')
-            content = request.form.get('content')
-            
-            if not title or not content:
-                flash('Sarlavha va mazumni to\'ldiring', 'error')
-                return redirect(url_for('blog_create'))
-            
-            post = BlogPost(
-                title=title,
-                content=content,
-                author_id=current_user.id
-            )
-            
-            db.session.add(post)
-            db.session.commit()
-            
-            flash('Post muvaffaqiyatli yaratildi!', 'success')
-            return redirect(url_for('blog_index'))
-            
-        except Exception as e:
-            db.session.rollback()
-            flash('Post yaratishda xatolik yuz berdi', 'error')
-            return redirect(url_for('blog_create'))
-    
-    return render_template('blog/blog_create.html')
-
-@app.route('/blog/post/<int:post_id>/like', methods=['POST'])
-@login_required
-def like_post(post_id):
-    """Postga like bosish"""
-    try:
-        existing_like = PostLike.query.filter_by(
-            user_id=current_user.id, 
-            post_id=post_id
-        ).first()
-        
-        if existing_like:
-            db.session.delete(existing_like)
-            db.session.commit()
-            return jsonify({
-                'liked': False, 
-                'likes_count': PostLike.query.filter_by(post_id=post_id).count()
-            })
-        else:
-            like = PostLike(user_id=current_user.id, post_id=post_id)
-            db.session.add(like)
-            db.session.commit()
-            return jsonify({
-                'liked': True, 
-                'likes_count': PostLike.query.filter_by(post_id=post_id).count()
-            })
-            
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': 'Xatolik yuz berdi'}), 500
-
-@app.route('/blog/post/<int:post_id>/comment', methods=['POST'])
-@login_required
-def add_comment(post_id):
-    """Postga comment qo'shish"""
-    try:
-        content = request.form.get('content')
-        
-        if not content:
-            flash('Izoh matnini kiriting', 'error')
-            return redirect(url_for('blog_post', post_id=post_id))
-        
-        comment = PostComment(
-            content=content,
-            user_id=current_user.id,
-            post_id=post_id
-        )
-        
-        db.session.add(comment)
-        db.session.commit()
-        
-        flash('Izoh muvaffaqiyatli qo\'shildi!', 'success')
-        return redirect(url_for('blog_post', post_id=post_id))
-        
-    except Exception as e:
-        db.session.rollback()
-        flash('Izoh qo\'shishda xatolik yuz berdi', 'error')
-        return redirect(url_for('blog_post', post_id=post_id))
-
-# ===== ADMIN ROUTES =====
-@app.route('/admin-login', methods=['GET', 'POST'])
+@admin_bp.route('/admin-login', methods=['GET', 'POST'])
 def admin_login():
     """Admin login sahifasi"""
     if current_user.is_authenticated and current_user.is_admin:
-        return redirect(url_for('admin_dashboard'))
+        return redirect(url_for('.admin_dashboard'))
         
     if request.method == 'POST':
         try:
@@ -404,16 +63,16 @@ def admin_login():
             if user and check_password_hash(user.password_hash, password) and user.is_admin:
                 login_user(user)
                 flash(f'Xush kelibsiz, Admin {user.name}!', 'success')
-                return redirect(url_for('admin_dashboard'))
+                return redirect(url_for('.admin_dashboard'))
             else:
                 flash('Email, parol noto\'g\'ri yoki sizda admin huquqi yo\'q', 'error')
                 
         except Exception as e:
             flash('Kirishda xatolik yuz berdi. Iltimos, qayta urinib ko\'ring.', 'error')
     
-    return render_template('admin_login.html')
+    return render_template('admin/admin_login.html')
 
-@app.route('/admin')
+@admin_bp.route('/admin')
 @login_required
 def admin_dashboard():
     """Admin dashboard sahifasi"""
@@ -421,571 +80,212 @@ def admin_dashboard():
         flash('Sizda admin huquqi yo\'q', 'error')
         return redirect(url_for('index'))
     
-    stats = {
-        'total_users': User.query.count(),
-        'total_quizzes': Quiz.query.count(),
-        'total_posts': BlogPost.query.count(),
-        'total_comments': PostComment.query.count()
-    }
-    return render_template('admin/admin_dashboard.html', stats=stats)
-
-@app.route('/admin/quizzes')
-@login_required
-def admin_quizzes():
-    """Quizlarni boshqarish sahifasi"""
-    if not current_user.is_admin:
-        flash('Sizda admin huquqi yo\'q', 'error')
-        return redirect(url_for('index'))
-    
-    quizzes = Quiz.query.all()
-    return render_template('admin/admin_quizzes.html', quizzes=quizzes)
-
-@app.route('/admin/quiz/add', methods=['GET', 'POST'])
-@login_required
-def admin_quiz_add():
-    """Yangi quiz qo'shish"""
-    if not current_user.is_admin:
-        flash('Sizda admin huquqi yo\'q', 'error')
-        return redirect(url_for('index'))
-    
-    if request.method == 'POST':
-        try:
-            title = request.form.get('title')
-            description = request.form.get('description')
-            
-            if not title:
-                flash('Quiz nomini kiriting', 'error')
-                return redirect(url_for('admin_quiz_add'))
-            
-            quiz = Quiz(title=title, description=description)
-            db.session.add(quiz)
-            db.session.commit()
-            
-            flash('Quiz muvaffaqiyatli qo\'shildi!', 'success')
-            return redirect(url_for('admin_quizzes'))
-            
-        except Exception as e:
-            db.session.rollback()
-            flash('Quiz qo\'shishda xatolik yuz berdi', 'error')
-            return redirect(url_for('admin_quiz_add'))
-    
-    return render_template('admin/admin_quiz_add.html')
-
-@app.route('/admin/quiz/<int:quiz_id>/questions')
-@login_required
-def admin_quiz_questions(quiz_id):
-    """Quiz savollarini boshqarish"""
-    if not current_user.is_admin:
-        flash('Sizda admin huquqi yo\'q', 'error')
-        return redirect(url_for('index'))
+    def load_stats():
+        totals = DailyRollup.totals()
+        return {
+            'total_users': totals.new_users,
+            'total_quizzes': Quiz.query.count(),
+            'total_posts': totals.posts,
+            'total_comments': totals.comments,
+            'total_eco_points': totals.task_count
+        }
     
-    quiz = Quiz.query.get_or_404(quiz_id)
-    return render_template('admin/admin_quiz_edit.html', quiz=quiz)
+    stats = cache.get_or_set('admin_stats', load_stats, ttl=ADMIN_STATS_TTL, tags=('quizzes',))
+    return render_template('admin/admin_dashboard.html', stats=stats)
 
-@app.route('/admin/quiz/<int:quiz_id>/question/add', methods=['POST'])
+@admin_bp.route('/admin/cache-stats')
 @login_required
-def admin_question_add(quiz_id):
-    """Quizga yangi savol qo'shish"""
+def admin_cache_stats():
+    """Kesh hit/miss hisoblagichlari"""
     if not current_user.is_admin:
-        flash('Sizda admin huquqi yo\'q', 'error')
-        return redirect(url_for('index'))
-    
-    try:
-        question_text = request.form.get('question_text')
-        option_a = request.form.get('option_a')
-        option_b = request.form.get('option_b')
-        option_c = request.form.get('option_c')
-        option_d = request.form.get('option_d')
-        correct_answer = request.form.get('correct_answer')
-        points = request.form.get('points', 1, type=int)
-        
-        if not all([question_text, option_a, option_b, correct_answer]):
-            flash('Barcha kerakli maydonlarni to\'ldiring', 'error')
-            return redirect(url_for('admin_quiz_questions', quiz_id=quiz_id))
-        
-        question = QuizQuestion(
-            quiz_id=quiz_id,
-            question_text=question_text,
-            option_a=option_a,
-            option_b=option_b,
-            option_c=option_c,
-            option_d=option_d,
-            correct_answer=correct_answer,
-            points=points
-        )
-        
-        db.session.add(question)
-        db.session.commit()
-        
-        flash('Savol muvaffaqiyatli qo\'shildi!', 'success')
-        return redirect(url_for('admin_quiz_questions', quiz_id=quiz_id))
-        
-    except Exception as e:
-        db.session.rollback()
-        flash('Savol qo\'shishda xatolik yuz berdi', 'error')
-        return redirect(url_for('admin_quiz_questions', quiz_id=quiz_id))
+        return jsonify({'success': False, 'message': 'Sizda admin huquqi yo\'q'}), 403
+    return jsonify(cache.stats())
 
-@app.route('/admin/users')
+@admin_bp.route('/admin/users')
 @login_required
+@read_replica
 def admin_users():
     """Foydalanuvchilarni boshqarish"""
     if not current_user.is_admin:
         flash('Sizda admin huquqi yo\'q', 'error')
         return redirect(url_for('index'))
     
-    users = User.query.all()
-    return render_template('admin/admin_users.html', users=users)
-
-@app.route('/admin/posts')
+    page = keyset_paginate(
+        User.query,
+        User.created_at, User.id,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=ADMIN_PAGE_SIZE
+    )
+    page.total = approximate_count('User', User.query)
+    return render_template('admin/admin_users.html', users=page.items, page=page)
+
+@admin_bp.route('/admin/posts')
 @login_required
+@read_replica
 def admin_posts():
     """Postlarni boshqarish"""
     if not current_user.is_admin:
         flash('Sizda admin huquqi yo\'q', 'error')
         return redirect(url_for('index'))
     
-    posts = BlogPost.query.all()
-    return render_template('admin/admin_posts.html', posts=posts)
-
-@app.route('/admin/comments')
+    page = keyset_paginate(
+        BlogPost.query.options(db.joinedload(BlogPost.author)),
+        BlogPost.created_at, BlogPost.id,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=ADMIN_PAGE_SIZE
+    )
+    page.total = approximate_count('BlogPost', BlogPost.query)
+    BlogPost.attach_counts(page.items)
+    return render_template('admin/admin_posts.html', posts=page.items, page=page)
+
+@admin_bp.route('/admin/comments')
 @login_required
+@read_replica
 def admin_comments():
     """Kommentlarni boshqarish"""
     if not current_user.is_admin:
         flash('Sizda admin huquqi yo\'q', 'error')
         return redirect(url_for('index'))
     
-    comments = PostComment.query.all()
-    return render_template('admin/admin_comments.html', comments=comments)
-
-# ===== ASOSIY ROUTELAR =====
-@app.route('/')
-def index():
-    # Basic statistics
-    total_users = User.query.count() or 0
-    total_tasks = EcoPoint.query.count() or 0
-    total_co2 = total_tasks * 2
+    status = request.args.get('status', 'pending')
+    if status not in COMMENT_STATUSES:
+        status = 'pending'
     
-    # User stats if logged in
-    user_stats = {}
-    if current_user.is_authenticated:
-        total_points = EcoPoint.get_user_total_points(current_user.id)
-        user_level = total_points // 100
-        
-        # Today's tasks
-        today = datetime.now().date()
-        today_points = EcoPoint.query.filter_by(
-            user_id=current_user.id, 
-            date=today
-        ).with_entities(db.func.sum(EcoPoint.points)).scalar() or 0
-        
-        # Recent badges
-        recent_badges = Badge.query.filter_by(
-            user_id=current_user.id
-        ).order_by(Badge.earned_date.desc()).limit(3).all()
-        
-        user_stats = {
-            'total_points': total_points,
-            'level': user_level,
-            'badges_count': Badge.query.filter_by(user_id=current_user.id).count(),
-            'today_points': today_points,
-            'recent_badges': recent_badges,
-            'today_co2': round(today_points * 0.2, 1),
-            'today_water': int(today_points * 1.5),
-            'today_plastic': round(today_points * 0.1, 1)
-        }
-    
-    # Community statistics
-    total_co2_saved = total_tasks * 2
-    total_water_saved = total_tasks * 15
-    total_trees = total_co2_saved // 21 if total_co2_saved > 0 else 0
-    active_days = 30
+    query = PostComment.query.filter(*PostComment.moderation_filter(status))
     
-    return render_template('index.html',
-                         total_users=total_users,
-                         total_tasks=total_tasks,
-                         total_co2=total_co2,
-                         user_stats=user_stats,
-                         total_co2_saved=total_co2_saved,
-                         total_water_saved=total_water_saved,
-                         total_trees=total_trees,
-                         active_days=active_days,
-                         now=datetime.now())
+    page = keyset_paginate(
+        query.options(db.joinedload(PostComment.user), db.joinedload(PostComment.post)),
+        PostComment.created_at, PostComment.id,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=ADMIN_PAGE_SIZE
+    )
+    page.total = approximate_count(f'PostComment:{status}', query)
+    return render_template('admin/admin_comments.html', comments=page.items, page=page, status=status)
 
-@app.route('/register', methods=['GET', 'POST'])
-def register():
-    if current_user.is_authenticated:
-        return redirect(url_for('dashboard'))
-        
-    if request.method == 'POST':
-        try:
-            name = request.form.get('name', '').strip()
-            email = request.form.get('email', '').strip().lower()
-            password = request.form.get('password', '')
-            
-            # Validation
-            if not name or not email or not password:
-                flash('Barcha maydonlarni to\'ldiring', 'error')
-                return redirect(url_for('register'))
-            
-            if len(password) < 6:
-                flash('Parol kamida 6 ta belgidan iborat bo\'lishi kerak', 'error')
-                return redirect(url_for('register'))
-            
-            if User.query.filter_by(email=email).first():
-                flash('Bu email allaqachon ro\'yxatdan o\'tgan', 'error')
-                return redirect(url_for('register'))
-            
-            # Create user
-            hashed_password = generate_password_hash(password)
-            new_user = User(name=name, email=email, password_hash=hashed_password)
-            
-            db.session.add(new_user)
-            db.session.commit()
-            
-            # Auto login
-            login_user(new_user)
-            flash(f'Muvaffaqiyatli ro\'yxatdan o\'tdingiz! Xush kelibsiz, {name}!', 'success')
-            return redirect(url_for('dashboard'))
-            
-        except Exception as e:
-            db.session.rollback()
-            flash('Ro\'yxatdan o\'tishda xatolik yuz berdi. Iltimos, qayta urinib ko\'ring.', 'error')
-            return redirect(url_for('register'))
-    
-    return render_template('register.html')
-
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    if current_user.is_authenticated:
-        return redirect(url_for('dashboard'))
-        
-    if request.method == 'POST':
-        try:
-            email = request.form.get('email', '').strip().lower()
-            password = request.form.get('password', '')
-            
-            user = User.query.filter_by(email=email).first()
-            
-            if user and check_password_hash(user.password_hash, password):
-                login_user(user)
-                next_page = request.args.get('next')
-                flash(f'Xush kelibsiz, {user.name}!', 'success')
-                return redirect(next_page) if next_page else redirect(url_for('dashboard'))
-            else:
-                flash('Email yoki parol noto\'g\'ri', 'error')
-                
-        except Exception as e:
-            flash('Kirishda xatolik yuz berdi. Iltimos, qayta urinib ko\'ring.', 'error')
-    
-    return render_template('login.html')
-
-@app.route('/dashboard')
+@admin_bp.route('/admin/comments/moderate', methods=['POST'])
 @login_required
-def dashboard():
-    # Daily tasks
-    daily_tasks = [
-        {"id": 1, "name": "Plastikdan foydalanmang", "points": 10, "icon": "🚫"},
-        {"id": 2, "name": "Suvni tejang", "points": 15, "icon": "💧"},
-        {"id": 3, "name": "Eneriyani tejang", "points": 12, "icon": "⚡"},
-        {"id": 4, "name": "Qayta ishlang", "points": 20, "icon": "♻️"},
-        {"id": 5, "name": "O'simlik ekish", "points": 25, "icon": "🌱"}
-    ]
-    
-    # User statistics
-    total_points = EcoPoint.get_user_total_points(current_user.id)
-    user_level = total_points // 100
-    next_level_points = (user_level + 1) * 100 - total_points
-    
-    # Weekly statistics
-    week_ago = datetime.now() - timedelta(days=7)
-    weekly_points = EcoPoint.query.filter(
-        EcoPoint.user_id == current_user.id,
-        EcoPoint.date >= week_ago.date()
-    ).with_entities(db.func.sum(EcoPoint.points)).scalar() or 0
-    
-    weekly_tasks = EcoPoint.query.filter(
-        EcoPoint.user_id == current_user.id,
-        EcoPoint.date >= week_ago.date()
-    ).count()
-    
-    weekly_stats = {
-        'weekly_points': weekly_points,
-        'tasks_completed': weekly_tasks
-    }
-    
-    # Environmental impact
-    environmental_impact = calculate_environmental_impact(total_points)
-    
-    # Today's completed tasks
-    today = datetime.now().date()
-    completed_today = EcoPoint.query.filter_by(
-        user_id=current_user.id, 
-        date=today
-    ).all()
-    completed_task_ids = [point.task_type for point in completed_today]
+def admin_comments_moderate():
+    """Tanlangan izohlarni ommaviy tasdiqlash / rad etish / o'chirish"""
+    if not current_user.is_admin:
+        flash('Sizda admin huquqi yo\'q', 'error')
+        return redirect(url_for('index'))
     
-    # Random tip
-    random_tip = Tip.get_random_tip()
+    action = request.form.get('action')
+    comment_ids = request.form.getlist('ids', type=int)
+    status = request.form.get('status', 'pending')
+    if action not in PostComment.MODERATION_ACTIONS or not comment_ids:
+        flash('Izohlar va harakatni tanlang', 'error')
+        return redirect(url_for('.admin_comments', status=status))
     
-    return render_template('dashboard.html', 
-                         tasks=daily_tasks,
-                         total_points=total_points,
-                         user_level=user_level,
-                         next_level_points=next_level_points,
-                         random_tip=random_tip,
-                         weekly_stats=weekly_stats,
-                         environmental_impact=environmental_impact,
-                         completed_task_ids=completed_task_ids,
-                         now=datetime.now())
-
-@app.route('/complete_task', methods=['POST'])
-@login_required
-def complete_task():
     try:
-        task_id = request.json.get('task_id')
-        task_points = request.json.get('points')
-        
-        # Check if task already completed today
-        today = datetime.now().date()
-        existing_task = EcoPoint.query.filter_by(
-            user_id=current_user.id,
-            date=today,
-            task_type=f"task_{task_id}"
-        ).first()
-        
-        if existing_task:
-            return jsonify({
-                'success': False,
-                'message': 'Siz bugun bu topshiriqni allaqachon bajardingiz!'
-            })
-        
-        # Add task completion
-        new_point = EcoPoint(
-            user_id=current_user.id,
-            points=task_points,
-            task_type=f"task_{task_id}"
-        )
-        db.session.add(new_point)
+        affected = PostComment.moderate(comment_ids, action)
         db.session.commit()
-        
-        # Check for new badges
-        total_points = EcoPoint.get_user_total_points(current_user.id)
-        badge_name = Badge.assign_badge(current_user.id, total_points)
-        
-        return jsonify({
-            'success': True,
-            'total_points': total_points,
-            'badge_earned': badge_name,
-            'message': f'Tabriklaymiz! +{task_points} ball qo\'lga kiritdingiz!'
-        })
-        
     except Exception as e:
         db.session.rollback()
-        return jsonify({
-            'success': False,
-            'message': 'Xatolik yuz berdi. Iltimos, qayta urinib ko\'ring.'
-        })
-
-@app.route('/profile')
-@login_required
-def profile():
-    try:
-        total_points = EcoPoint.get_user_total_points(current_user.id)
-        user_level = total_points // 100
-        progress_percentage = total_points % 100
-        next_level_points = (user_level + 1) * 100 - total_points
-        
-        # Badges
-        badges = Badge.query.filter_by(user_id=current_user.id).order_by(Badge.earned_date.desc()).all()
-        
-        # Active days
-        active_days = db.session.query(db.func.count(db.func.distinct(EcoPoint.date))).filter(
-            EcoPoint.user_id == current_user.id
-        ).scalar() or 0
-        
-        # Today's tasks
-        today = datetime.now().date()
-        today_tasks_db = EcoPoint.query.filter_by(
-            user_id=current_user.id,
-            date=today
-        ).all()
-        
-        today_tasks = []
-        for task in today_tasks_db:
-            task_info = {
-                'icon': '🌿',
-                'name': 'Ekologik topshiriq',
-                'time': 'Bugun',
-                'points': task.points
-            }
-            if 'task_1' in task.task_type:
-                task_info.update({'icon': '🚫', 'name': 'Plastikdan foydalanmang'})
-            elif 'task_2' in task.task_type:
-                task_info.update({'icon': '💧', 'name': 'Suvni tejang'})
-            elif 'task_3' in task.task_type:
-                task_info.update({'icon': '⚡', 'name': 'Eneriyani tejang'})
-            elif 'task_4' in task.task_type:
-                task_info.update({'icon': '♻️', 'name': 'Qayta ishlang'})
-            elif 'task_5' in task.task_type:
-                task_info.update({'icon': '🌱', 'name': 'O\'simlik ekish'})
-            
-            today_tasks.append(task_info)
-        
-        # Today's points
-        today_points = sum(task.points for task in today_tasks_db)
-        
-        # Today's environmental impact
-        today_impact = calculate_environmental_impact(today_points)
-        today_comparisons = get_impact_comparisons(today_impact)
-        
-        # Recent activities
-        recent_activities = []
-        activities_db = EcoPoint.query.filter_by(
-            user_id=current_user.id
-        ).order_by(EcoPoint.date.desc()).limit(10).all()
-        
-        for activity in activities_db:
-            activity_info = {
-                'date': activity.date,
-                'icon': '✅',
-                'description': 'Ekologik topshiriq bajarildi',
-                'points': activity.points
-            }
-            if 'task_1' in activity.task_type:
-                activity_info.update({'icon': '🚫', 'description': 'Plastikdan foydalanmadingiz'})
-            elif 'task_2' in activity.task_type:
-                activity_info.update({'icon': '💧', 'description': 'Suv tejadingiz'})
-            elif 'task_3' in activity.task_type:
-                activity_info.update({'icon': '⚡', 'description': 'Eneriya tejadingiz'})
-            elif 'task_4' in activity.task_type:
-                activity_info.update({'icon': '♻️', 'description': 'Chiqlarni qayta ishladingiz'})
-            elif 'task_5' in activity.task_type:
-                activity_info.update({'icon': '🌱', 'description': 'O\'simlik ekdingiz'})
-            
-            recent_activities.append(activity_info)
-        
-        # Total environmental impact
-        total_impact = calculate_environmental_impact(total_points)
-        total_comparisons = get_impact_comparisons(total_impact)
-        
-        # Next badge info
-        next_badge = get_next_badge_info(total_points)
-        
-        # Last activity
-        last_activity = "Bugun"
-        if recent_activities:
-            last_activity_date = recent_activities[0]['date']
-            if last_activity_date == datetime.now().date():
-                last_activity = "Bugun"
-            else:
-                days_ago = (datetime.now().date() - last_activity_date).days
-                last_activity = f"{days_ago} kun oldin"
-        
-        return render_template('profile.html',
-                             user=current_user,
-                             total_points=total_points,
-                             user_level=user_level,
-                             progress_percentage=progress_percentage,
-                             next_level_points=next_level_points,
-                             badges=badges,
-                             active_days=active_days,
-                             today_date=datetime.now().strftime('%Y-%m-%d'),
-                             today_tasks=today_tasks,
-                             today_points=today_points,
-                             today_co2=today_impact['co2_saved'],
-                             today_water=int(today_impact['water_saved']),
-                             today_plastic=today_impact['plastic_saved'],
-                             co2_car_km=today_comparisons['co2_car_km'],
-                             water_showers=today_comparisons['water_showers'],
-                             plastic_bottles=today_comparisons['plastic_bottles'],
-                             recent_activities=recent_activities,
-                             total_co2_saved=total_impact['co2_saved'],
-                             total_water_saved=int(total_impact['water_saved']),
-                             total_plastic_saved=total_impact['plastic_saved'],
-                             total_energy_saved=int(total_impact['energy_saved']),
-                             total_co2_trees=round(total_impact['co2_saved'] / 21) if total_impact['co2_saved'] > 0 else 0,
-                             total_water_showers=round(total_impact['water_saved'] / 65) if total_impact['water_saved'] > 0 else 0,
-                             total_plastic_bottles=round(total_impact['plastic_saved'] / 0.05) if total_impact['plastic_saved'] > 0 else 0,
-                             total_energy_homes=round(total_impact['energy_saved'] / 30) if total_impact['energy_saved'] > 0 else 0,
-                             next_badge=next_badge,
-                             last_activity=last_activity)
-                             
-    except Exception as e:
-        print(f"Profile error: {str(e)}")
-        flash('Profilni yuklashda xatolik yuz berdi', 'error')
-        return redirect(url_for('dashboard'))
+        flash('Moderatsiyada xatolik yuz berdi', 'error')
+        return redirect(url_for('.admin_comments', status=status))
+    
+    flash(f'{affected} ta izoh uchun amal bajarildi', 'success')
+    return redirect(url_for('.admin_comments', status=status))
 
-@app.route('/stats')
+@admin_bp.route('/admin/eco-points')
 @login_required
-def stats():
-    """Statistika sahifasi"""
+@read_replica
+def admin_eco_points():
+    """Eco ballarni ko'rish"""
+    if not current_user.is_admin:
+        flash('Sizda admin huquqi yo\'q', 'error')
+        return redirect(url_for('index'))
+    
+    # EcoPoint'da created_at yo'q - (date, id) bo'yicha sahifalaymiz
+    page = keyset_paginate(
+        EcoPoint.query,
+        EcoPoint.date, EcoPoint.id,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=ADMIN_PAGE_SIZE
+    )
+    page.total = approximate_count('EcoPoint', EcoPoint.query)
+    users = User.query.filter(User.id.in_({point.user_id for point in page.items})).all()
+    return render_template('admin_eco_points.html', eco_points=page.items, users=users, page=page)
+
+def export_rows(stmt):
+    """Natijani server-side kursor bilan EXPORT_CHUNK_SIZE bo'laklarda o'qish"""
+    result = db.session.execute(stmt, execution_options={'yield_per': EXPORT_CHUNK_SIZE})
     try:
-        total_points = EcoPoint.get_user_total_points(current_user.id)
-        user_level = total_points // 100
-        
-        # Haftalik statistikalar
-        week_ago = datetime.now() - timedelta(days=7)
-        weekly_points = EcoPoint.query.filter(
-            EcoPoint.user_id == current_user.id,
-            EcoPoint.date >= week_ago.date()
-        ).with_entities(db.func.sum(EcoPoint.points)).scalar() or 0
-        
-        weekly_tasks = EcoPoint.query.filter(
-            EcoPoint.user_id == current_user.id,
-            EcoPoint.date >= week_ago.date()
-        ).count()
-        
-        weekly_stats = {
-            'weekly_points': weekly_points,
-            'tasks_completed': weekly_tasks
-        }
-        
-        # Atrof-muhitga ta'sir
-        environmental_impact = calculate_environmental_impact(total_points)
-        
-        # Yutuqlar
-        badges = Badge.query.filter_by(user_id=current_user.id).all()
-        
-        return render_template('stats.html',
-                             total_points=total_points,
-                             user_level=user_level,
-                             weekly_stats=weekly_stats,
-                             environmental_impact=environmental_impact,
-                             badges=badges)
-                             
-    except Exception as e:
-        print(f"Stats error: {str(e)}")
-        flash('Statistikani yuklashda xatolik yuz berdi', 'error')
-        return redirect(url_for('dashboard'))
-
-@app.route('/logout')
-@login_required
-def logout():
-    logout_user()
-    flash('Siz tizimdan muvaffaqiyatli chiqdingiz', 'info')
-    return redirect(url_for('index'))
+        yield from result.partitions()
+    finally:
+        result.close()
+
+def export_csv(header, stmt):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield buffer.getvalue()
+    
+    for rows in export_rows(stmt):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+def export_ndjson(header, stmt):
+    for rows in export_rows(stmt):
+        yield ''.join(
+            json.dumps(dict(zip(header, row)), ensure_ascii=False, default=lambda value: value.isoformat()) + '\n'
+            for row in rows
+        )
 
-@app.route('/get_tip')
+@admin_bp.route('/admin/export/<kind>')
 @login_required
-def get_tip():
-    random_tip = Tip.get_random_tip()
-    return jsonify({'tip': random_tip})
-
-# Error handlers
-@app.errorhandler(404)
-def not_found_error(error):
-    return render_template('errors/404.html'), 404
+def admin_export(kind):
+    """Jadvalni CSV yoki NDJSON ko'rinishida oqim bilan yuklab olish.
 
-@app.errorhandler(500)
-def internal_error(error):
-    db.session.rollback()
-    return render_template('errors/500.html'), 500
-
-if __name__ == '__main__':
-    with app.app_context():
-        init_db()
-    print("🌿 EcoTrack ilovasi ishga tushmoqda...")
-    print("📍 Manzil: http://127.0.0.1:5000")
-    print("🔐 Admin login: admin@ecotrack.com / admin123")
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    Parametrlar: format=csv|ndjson, from/to (YYYY-MM-DD, ikkalasi ham kiradi), user_id.
+    """
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'message': 'Sizda admin huquqi yo\'q'}), 403
+    
+    export = EXPORTS.get(kind)
+    if not export:
+        return jsonify({'success': False, 'message': 'Bunday eksport mavjud emas'}), 404
+    
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'success': False, 'message': 'format csv yoki ndjson bo\'lishi kerak'}), 400
+    
+    date_column = export['date_column']
+    stmt = db.select(*export['columns']).order_by(export['columns'][0])
+    try:
+        for param in ('from', 'to'):
+            value = request.args.get(param)
+            if not value:
+                continue
+            bound = datetime.strptime(value, '%Y-%m-%d')
+            if param == 'to':
+                bound += timedelta(days=1)
+            if date_column.type.python_type is not datetime:
+                bound = bound.date()
+            stmt = stmt.where(date_column >= bound if param == 'from' else date_column < bound)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Sana YYYY-MM-DD formatida bo\'lishi kerak'}), 400
+    
+    user_id = request.args.get('user_id', type=int)
+    if user_id is not None:
+        stmt = stmt.where(export['user_column'] == user_id)
+    
+    header = [column.key for column in export['columns']]
+    if fmt == 'csv':
+        body, mimetype = export_csv(header, stmt), 'text/csv'
+    else:
+        body, mimetype = export_ndjson(header, stmt), 'application/x-ndjson'
+    
+    filename = f"{kind}-{datetime.now().strftime('%Y%m%d')}.{fmt}"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
@@ -1,150 +1,77 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Flask, current_app, render_template, request, redirect, url_for, flash, jsonify, session, make_response
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
+from flask.cli import with_appcontext
 from werkzeug.security import generate_password_hash, check_password_hash
-from flask_sqlalchemy import SQLAlchemy
+from werkzeug.utils import import_string
+from markupsafe import Markup
 from datetime import datetime, timedelta
-import random
-import os
+import click
+import hashlib
+import time
 
-# Database initialization
-db = SQLAlchemy()
+from cache import cache, LocalBackend
+from catalog import catalog
+from config import Config
+from migrations import upgrade_schema
+from models import db, read_replica, primary_reads, User, EcoPoint, UserStats, Badge, Tip, BlogPost, DailyRollup, QuizStats
+from utils import insert_or_ignore, set_sqlite_pragmas, engine_options_for
 
-class User(UserMixin, db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(100), unique=True, nullable=False)
-    password_hash = db.Column(db.String(200), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    is_admin = db.Column(db.Boolean, default=False)
-    
-    def __repr__(self):
-        return f'<User {self.name}>'
-
-class EcoPoint(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    date = db.Column(db.Date, default=datetime.utcnow)
-    points = db.Column(db.Integer, default=0)
-    task_type = db.Column(db.String(50), nullable=False)
-    description = db.Column(db.String(200))
-    
-    @staticmethod
-    def get_user_total_points(user_id):
-        result = db.session.query(db.func.sum(EcoPoint.points)).filter(
-            EcoPoint.user_id == user_id
-        ).scalar()
-        return result if result else 0
-    
-    def __repr__(self):
-        return f'<EcoPoint {self.points} - {self.date}>'
-
-class Badge(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    badge_name = db.Column(db.String(100), nullable=False)
-    badge_description = db.Column(db.String(200))
-    earned_date = db.Column(db.Date, default=datetime.utcnow)
-    badge_icon = db.Column(db.String(50), default='🛡️')
-    
-    @staticmethod
-    def assign_badge(user_id, total_points):
-        badges = {
-            50: {"name": "Green Starter", "description": "Yashil yo'l boshlovchisi", "icon": "🌱"},
-            100: {"name": "Eco Friend", "description": "Tabiat do'sti", "icon": "🤝"},
-            200: {"name": "Nature Guardian", "description": "Tabiat himoyachisi", "icon": "🛡️"},
-            500: {"name": "Planet Hero", "description": "Sayyora qahramoni", "icon": "🦸"},
-            1000: {"name": "Eco Master", "description": "Ekologiya ustasi", "icon": "🏆"}
-        }
-        
-        earned_badge = None
-        
-        for points, badge_info in badges.items():
-            if total_points >= points:
-                existing_badge = Badge.query.filter_by(
-                    user_id=user_id, 
-                    badge_name=badge_info["name"]
-                ).first()
-                
-                if not existing_badge:
-                    new_badge = Badge(
-                        user_id=user_id,
-                        badge_name=badge_info["name"],
-                        badge_description=badge_info["description"],
-                        badge_icon=badge_info["icon"]
-                    )
-                    db.session.add(new_badge)
-                    db.session.commit()
-                    earned_badge = badge_info["name"]
-        
-        return earned_badge
-
-class Tip(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    text = db.Column(db.Text, nullable=False)
-    category = db.Column(db.String(50), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    @staticmethod
-    def get_random_tip():
-        tips = Tip.query.all()
-        return random.choice(tips).text if tips else "Tabiatni seving! 🌍"
-
-# Blog Modellari
-class BlogPost(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    title = db.Column(db.String(200), nullable=False)
-    content = db.Column(db.Text, nullable=False)
-    author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    is_published = db.Column(db.Boolean, default=True)
-    
-    author = db.relationship('User', backref='posts')
-    
-    def __repr__(self):
-        return f'<BlogPost {self.title}>'
+# Bosh sahifa keshi: anonim javob va umumiy statistika fragmenti. Faqat TTL bilan eskiradi -
+# statistika har bir topshiriqda o'zgaradi, har yozuvda bekor qilish keshni foydasiz qilardi
+LANDING_CACHE_TTL = 30
 
-class PostLike(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    post_id = db.Column(db.Integer, db.ForeignKey('blog_post.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    def __repr__(self):
-        return f'<PostLike user:{self.user_id} post:{self.post_id}>'
-
-class PostComment(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    content = db.Column(db.Text, nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    post_id = db.Column(db.Integer, db.ForeignKey('blog_post.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    is_approved = db.Column(db.Boolean, default=True)
-    
-    user = db.relationship('User', backref='comments')
-    
-    def __repr__(self):
-        return f'<PostComment {self.content[:50]}...>'
-
-# Flask app initialization
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'eco-track-secret-key-2024'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///eco.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-db.init_app(app)
+# Oflayn topshiriqlar batch API cheklovlari
+BATCH_MAX_ITEMS = 500
+BATCH_MAX_AGE_DAYS = 7
 
 login_manager = LoginManager()
-login_manager.init_app(app)
 login_manager.login_view = 'login'
 login_manager.login_message = 'Iltimos, tizimga kiring!'
 
+# Sessiya foydalanuvchisi keshi (har bir jarayonda alohida, qisqa TTL)
+USER_CACHE_TTL = 60
+USER_CACHE_MAX_SIZE = 10000
+_session_users = LocalBackend(USER_CACHE_MAX_SIZE)
+
+class SessionUser(UserMixin):
+    """load_user qaytaradigan yengil foydalanuvchi: faqat identifikatsiya maydonlari"""
+    def __init__(self, id, name, email, is_admin, created_at):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.is_admin = is_admin
+        self.created_at = created_at
+    
+    def __repr__(self):
+        return f'<SessionUser {self.name}>'
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    cached = _session_users.get(user_id)
+    if cached:
+        return SessionUser(**cached[1])
+    
+    user = db.session.get(User, int(user_id))
+    if user is None:
+        return None
+    identity = {
+        'id': user.id,
+        'name': user.name,
+        'email': user.email,
+        'is_admin': bool(user.is_admin),
+        'created_at': user.created_at
+    }
+    _session_users.set(user_id, (identity,), USER_CACHE_TTL)
+    # Kesh hit va miss'da bir xil tur - current_user ORM atributlariga tayanib qolmasin
+    return SessionUser(**identity)
+
+@db.event.listens_for(User, 'after_update')
+@db.event.listens_for(User, 'after_delete')
+def _invalidate_session_user(mapper, connection, target):
+    _session_users.delete(str(target.id))
 
 def create_admin_user():
-    """Admin foydalanuvchi yaratish"""
+    """Admin foydalanuvchi yaratish (agar mavjud bo'lmasa)"""
     admin_email = "admin@ecotrack.com"
     admin_user = User.query.filter_by(email=admin_email).first()
     
@@ -158,46 +85,105 @@ def create_admin_user():
         )
         db.session.add(new_admin)
         db.session.commit()
-        print("✅ Admin foydalanuvchi yaratildi: admin@ecotrack.com / admin123")
+        print("✅ Admin foydalanuvchi yaratildi:")
+        print("   Email: admin@ecotrack.com")
+        print("   Parol: admin123")
+
+def backfill_schema_changes(changes):
+    """upgrade_schema() qo'shgan hosila ustunlarni xom jadvallardan to'ldirish"""
+    if 'column blog_post.like_count' in changes:
+        # Ustun DEFAULT 0 bilan qo'shiladi - mavjud like'lar qayta sanalmasa 0 (va unlike'da -1) bo'lardi
+        BlogPost.rebuild_like_counts()
+        db.session.commit()
+        print("✅ blog_post.like_count post_like'dan to'ldirildi")
 
 def init_db():
-    with app.app_context():
-        db.create_all()
-        create_admin_user()
+    """Jadvallarni yaratish va boshlang'ich ma'lumotlarni qo'shish (app context ichida)"""
+    # Jadvallarni yaratish va mavjud bazaga yetishmayotgan ustun/indekslarni qo'shish
+    # (create_all() mavjud jadvalga yangi ustun qo'shmaydi - masalan blog_post.like_count)
+    backfill_schema_changes(upgrade_schema(db.engine, db.metadata))
+    
+    # Yangi yaratilgan daily_rollup'ni mavjud ma'lumotlardan to'ldirish
+    if not DailyRollup.query.first() and User.query.first():
+        DailyRollup.rebuild()
+        db.session.commit()
+    
+    # Admin foydalanuvchi yaratish
+    create_admin_user()
+    
+    # Add initial tips if empty
+    if Tip.query.count() == 0:
+        tips_data = [
+            {"text": "Bugun plastik ishlatmang 🌿", "category": "daily"},
+            {"text": "Daraxt eking 🌳", "category": "action"},
+            {"text": "Yorug'likni tejang 💡", "category": "energy"},
+            {"text": "Suvni tejang 💧", "category": "water"},
+            {"text": "Qayta ishlang ♻️", "category": "recycle"},
+            {"text": "Velosiped haydang 🚲", "category": "transport"},
+            {"text": "Mahalliy mahsulotlar sotib oling 🍎", "category": "shopping"},
+            {"text": "Kompost qiling 🍂", "category": "waste"},
+        ]
         
-        # Test foydalanuvchi yaratish
-        test_user = User.query.filter_by(email="test@test.com").first()
-        if not test_user:
-            test_password = generate_password_hash("test123")
-            new_user = User(
-                name="Test User",
-                email="test@test.com",
-                password_hash=test_password
-            )
-            db.session.add(new_user)
-            db.session.commit()
-            print("✅ Test foydalanuvchi yaratildi: test@test.com / test123")
+        for tip_info in tips_data:
+            tip = Tip(text=tip_info["text"], category=tip_info["category"])
+            db.session.add(tip)
         
-        if Tip.query.count() == 0:
-            tips_data = [
-                {"text": "Bugun plastik ishlatmang 🌿", "category": "daily"},
-                {"text": "Daraxt eking 🌳", "category": "action"},
-                {"text": "Yorug'likni tejang 💡", "category": "energy"},
-                {"text": "Suvni tejang 💧", "category": "water"},
-                {"text": "Qayta ishlang ♻️", "category": "recycle"},
-                {"text": "Velosiped haydang 🚲", "category": "transport"},
-                {"text": "Mahalliy mahsulotlar sotib oling 🍎", "category": "shopping"},
-                {"text": "Kompost qiling 🍂", "category": "waste"},
-            ]
-            
-            for tip_info in tips_data:
-                tip = Tip(text=tip_info["text"], category=tip_info["category"])
-                db.session.add(tip)
-            
-            db.session.commit()
-            print("✅ Database initialized with sample data")
+        db.session.commit()
+        print("✅ Database initialized with sample data")
+
+@click.command('upgrade-db')
+@with_appcontext
+def upgrade_db_command():
+    """Mavjud bazaga yetishmayotgan jadval, ustun va indekslarni qo'shish"""
+    changes = upgrade_schema(db.engine, db.metadata)
+    for change in changes:
+        print(f"  + {change}")
+    print(f"✅ Baza sxemasi yangilandi ({len(changes)} ta o'zgarish)")
+    
+    backfill_schema_changes(changes)
+    if 'table daily_rollup' in changes:
+        rows = DailyRollup.rebuild()
+        db.session.commit()
+        print(f"✅ daily_rollup to'ldirildi: {rows} ta qator")
+
+@click.command('rebuild-rollup')
+@with_appcontext
+def rebuild_rollup_command():
+    """daily_rollup jadvalini xom jadvallardan qayta qurish"""
+    rows = DailyRollup.rebuild()
+    db.session.commit()
+    print(f"✅ daily_rollup qayta qurildi: {rows} ta qator")
+
+@click.command('reconcile-stats')
+@with_appcontext
+def reconcile_stats_command():
+    """UserStats jadvalini EcoPoint tarixidan qayta qurish"""
+    UserStats.rebuild()
+    BlogPost.rebuild_like_counts()
+    db.session.commit()
+    print(f"✅ UserStats qayta qurildi: {UserStats.query.count()} ta foydalanuvchi")
+    print("✅ Postlar like soni qayta hisoblandi")
+
+@click.command('backfill-badges')
+@with_appcontext
+def backfill_badges_command():
+    """Barcha foydalanuvchilarga yetgan badge'larni berish (avval reconcile-stats)"""
+    inserted = Badge.backfill()
+    db.session.commit()
+    cache.clear()
+    print(f"✅ {inserted} ta badge berildi")
+
+@click.command('rebuild-quiz-stats')
+@with_appcontext
+def rebuild_quiz_stats_command():
+    """Quiz hisoblagichlari va reytinglarini quiz_attempt jadvalidan qayta qurish"""
+    QuizStats.rebuild()
+    db.session.commit()
+    cache.clear()
+    print(f"✅ Quiz statistikasi qayta qurildi: {QuizStats.query.count()} ta quiz")
 
 def calculate_environmental_impact(points):
+    """Calculate environmental impact based on points"""
     return {
         'co2_saved': round(points * 0.2, 1),
         'water_saved': points * 1.5,
@@ -205,32 +191,170 @@ def calculate_environmental_impact(points):
         'energy_saved': points * 0.5
     }
 
-# ===== ASOSIY ROUTELAR =====
-@app.route('/')
+def get_impact_comparisons(impact):
+    """Get environmental impact comparisons"""
+    return {
+        'co2_car_km': round(impact['co2_saved'] / 0.404, 1) if impact['co2_saved'] > 0 else 0,
+        'water_showers': round(impact['water_saved'] / 65) if impact['water_saved'] > 0 else 0,
+        'plastic_bottles': round(impact['plastic_saved'] / 0.05) if impact['plastic_saved'] > 0 else 0,
+        'energy_homes': round(impact['energy_saved'] / 30) if impact['energy_saved'] > 0 else 0
+    }
+
+def get_next_badge_info(total_points):
+    """Get information about the next badge to earn"""
+    reached = catalog.reached_badges(total_points)
+    next_badge = catalog.next_badge(total_points)
+    
+    # Calculate progress to next badge
+    if len(reached) == len(catalog.badges):
+        progress = 100  # All badges earned
+    else:
+        previous_points = reached[-1]['points'] if reached else 0
+        progress = ((total_points - previous_points) /
+                    (next_badge['points'] - previous_points)) * 100
+    
+    return {
+        'name': next_badge['name'],
+        'description': next_badge['description'],
+        'icon': next_badge['icon'],
+        'current': total_points,
+        'required': next_badge['points'],
+        'progress': min(100, progress)
+    }
+
+def get_user_summary(user_id, recent_limit=10):
+    """Dashboard, profil va statistika uchun foydalanuvchi ma'lumotlarini yig'ish.
+
+    Umumiy qiymatlar UserStats'dan, haftalik va bugungi qiymatlar esa
+    daily_rollup'ning oxirgi 8 kunlik qatorlaridan bitta so'rov bilan olinadi.
+    Bugungi yozuvlar alohida (user_id, date) so'rovi bilan olinadi - so'nggi
+    faolliklar ro'yxati (recent_limit) quiz yozuvlari tufayli ularni qirqib qo'yishi mumkin.
+    """
+    today = datetime.now().date()
+    week_ago = today - timedelta(days=7)
+
+    window = db.select(
+        db.func.coalesce(db.func.sum(DailyRollup.points), 0).label('weekly_points'),
+        db.func.coalesce(db.func.sum(DailyRollup.task_count), 0).label('weekly_tasks'),
+        db.func.coalesce(db.func.sum(
+            db.case((DailyRollup.day == today, DailyRollup.points), else_=0)
+        ), 0).label('today_points')
+    ).where(
+        DailyRollup.user_id == user_id,
+        DailyRollup.task_type == '',
+        DailyRollup.day >= week_ago
+    ).subquery()
+
+    row = db.session.execute(
+        db.select(
+            window,
+            UserStats.total_points,
+            UserStats.task_count,
+            UserStats.active_days,
+            UserStats.last_activity_date
+        ).select_from(window).outerjoin(UserStats, UserStats.user_id == user_id)
+    ).one()
+
+    if row.total_points is None:
+        # UserStats qatori hali yo'q (reconcile-stats ishga tushirilmagan) - tarixdan hisoblaymiz
+        history = db.session.execute(
+            UserStats.history_query().where(EcoPoint.user_id == user_id)
+        ).first()
+        _, total_points, task_count, active_days, last_activity_date = history or (None, 0, 0, 0, None)
+    else:
+        total_points, task_count = row.total_points, row.task_count
+        active_days, last_activity_date = row.active_days, row.last_activity_date
+
+    recent_activities = []
+    if recent_limit:
+        recent_activities = EcoPoint.query.filter_by(
+            user_id=user_id
+        ).order_by(EcoPoint.date.desc(), EcoPoint.id.desc()).limit(recent_limit).all()
+    today_activities = EcoPoint.query.filter_by(
+        user_id=user_id, date=today
+    ).order_by(EcoPoint.id.desc()).all()
+
+    return {
+        'total_points': total_points,
+        'task_count': task_count,
+        'active_days': active_days,
+        'last_activity_date': last_activity_date,
+        'user_level': catalog.level(total_points),
+        'next_level_points': catalog.next_level_points(total_points),
+        'progress_percentage': catalog.level_progress(total_points),
+        'weekly_stats': {
+            'weekly_points': row.weekly_points,
+            'tasks_completed': row.weekly_tasks
+        },
+        'today_points': row.today_points,
+        'today_activities': today_activities,
+        'completed_task_ids': [activity.task_type for activity in today_activities],
+        'recent_activities': recent_activities
+    }
+
+def render_global_stats():
+    """Umumiy statistika fragmentini LANDING_CACHE_TTL davomida qayta ishlatish"""
+    return cache.get_or_set('global_stats', _render_global_stats, ttl=LANDING_CACHE_TTL)
+
+def _render_global_stats():
+    totals = DailyRollup.totals()
+    total_tasks = totals.task_count
+    total_co2_saved = total_tasks * 2
+    context = {
+        'total_users': totals.new_users,
+        'total_tasks': total_tasks,
+        'total_co2_saved': total_co2_saved,
+        'total_water_saved': total_tasks * 15,
+        'total_trees': total_co2_saved // 21
+    }
+    return {
+        'context': context,
+        'html': Markup(render_template('includes/global_stats.html', **context))
+    }
+
+def landing_response(page):
+    """Keshlangan anonim sahifa uchun ETag/Last-Modified'li shartli javob"""
+    response = make_response(page['body'])
+    response.set_etag(page['etag'])
+    response.last_modified = page['last_modified']
+    response.cache_control.public = True
+    response.cache_control.max_age = max(int(page['expires_at'] - time.time()), 0)
+    response.vary.add('Cookie')
+    return response.make_conditional(request)
+
 def index():
-    total_users = User.query.count() or 0
-    total_tasks = EcoPoint.query.count() or 0
+    # Anonim (flash xabarsiz) so'rovlar uchun tayyor javob
+    anonymous = not current_user.is_authenticated and '_flashes' not in session
+    if anonymous:
+        page = cache.get('landing_page')
+        if page:
+            return landing_response(page)
+    
+    # Basic statistics (keshlangan fragment)
+    global_stats = render_global_stats()
+    total_users = global_stats['context']['total_users']
+    total_tasks = global_stats['context']['total_tasks']
     total_co2 = total_tasks * 2
     
+    # User stats if logged in
     user_stats = {}
     if current_user.is_authenticated:
         total_points = EcoPoint.get_user_total_points(current_user.id)
-        user_level = total_points // 100
+        user_level = catalog.level(total_points)
         
+        # Today's tasks
         today = datetime.now().date()
-        today_points = EcoPoint.query.filter_by(
-            user_id=current_user.id, 
-            date=today
-        ).with_entities(db.func.sum(EcoPoint.points)).scalar() or 0
+        today_rollup = db.session.get(DailyRollup, (current_user.id, today, ''))
+        today_points = today_rollup.points if today_rollup else 0
         
-        recent_badges = Badge.query.filter_by(
-            user_id=current_user.id
-        ).order_by(Badge.earned_date.desc()).limit(3).all()
+        # Recent badges
+        badges = Badge.for_user(current_user.id)
+        recent_badges = badges[:3]
         
         user_stats = {
             'total_points': total_points,
             'level': user_level,
-            'badges_count': Badge.query.filter_by(user_id=current_user.id).count(),
+            'badges_count': len(badges),
             'today_points': today_points,
             'recent_badges': recent_badges,
             'today_co2': round(today_points * 0.2, 1),
@@ -238,23 +362,33 @@ def index():
             'today_plastic': round(today_points * 0.1, 1)
         }
     
-    total_co2_saved = total_tasks * 2
-    total_water_saved = total_tasks * 15
-    total_trees = total_co2_saved // 21 if total_co2_saved > 0 else 0
+    # Community statistics
     active_days = 30
     
-    return render_template('index.html',
+    html = render_template('index.html',
                          total_users=total_users,
                          total_tasks=total_tasks,
                          total_co2=total_co2,
                          user_stats=user_stats,
-                         total_co2_saved=total_co2_saved,
-                         total_water_saved=total_water_saved,
-                         total_trees=total_trees,
+                         total_co2_saved=global_stats['context']['total_co2_saved'],
+                         total_water_saved=global_stats['context']['total_water_saved'],
+                         total_trees=global_stats['context']['total_trees'],
+                         global_stats=global_stats['html'],
                          active_days=active_days,
                          now=datetime.now())
+    
+    if anonymous:
+        page = {
+            'body': html,
+            'etag': hashlib.md5(html.encode()).hexdigest(),
+            'last_modified': datetime.utcnow().replace(microsecond=0),
+            'expires_at': time.time() + LANDING_CACHE_TTL
+        }
+        cache.set('landing_page', page, ttl=LANDING_CACHE_TTL)
+        return landing_response(page)
+    
+    return html
 
-@app.route('/register', methods=['GET', 'POST'])
 def register():
     if current_user.is_authenticated:
         return redirect(url_for('dashboard'))
@@ -265,6 +399,7 @@ def register():
             email = request.form.get('email', '').strip().lower()
             password = request.form.get('password', '')
             
+            # Validation
             if not name or not email or not password:
                 flash('Barcha maydonlarni to\'ldiring', 'error')
                 return redirect(url_for('register'))
@@ -277,12 +412,17 @@ def register():
                 flash('Bu email allaqachon ro\'yxatdan o\'tgan', 'error')
                 return redirect(url_for('register'))
             
+            # Create user
             hashed_password = generate_password_hash(password)
             new_user = User(name=name, email=email, password_hash=hashed_password)
             
             db.session.add(new_user)
+            db.session.flush()
+            # Yig'ma qator shu tranzaksiyada - birinchi topshiriq oddiy UPDATE bo'ladi
+            db.session.add(UserStats(user_id=new_user.id))
             db.session.commit()
             
+            # Auto login
             login_user(new_user)
             flash(f'Muvaffaqiyatli ro\'yxatdan o\'tdingiz! Xush kelibsiz, {name}!', 'success')
             return redirect(url_for('dashboard'))
@@ -294,7 +434,6 @@ def register():
     
     return render_template('register.html')
 
-@app.route('/login', methods=['GET', 'POST'])
 def login():
     if current_user.is_authenticated:
         return redirect(url_for('dashboard'))
@@ -319,95 +458,78 @@ def login():
     
     return render_template('login.html')
 
-@app.route('/dashboard')
 @login_required
 def dashboard():
-    daily_tasks = [
-        {"id": 1, "name": "Plastikdan foydalanmang", "points": 10, "icon": "🚫"},
-        {"id": 2, "name": "Suvni tejang", "points": 15, "icon": "💧"},
-        {"id": 3, "name": "Eneriyani tejang", "points": 12, "icon": "⚡"},
-        {"id": 4, "name": "Qayta ishlang", "points": 20, "icon": "♻️"},
-        {"id": 5, "name": "O'simlik ekish", "points": 25, "icon": "🌱"}
-    ]
-    
-    total_points = EcoPoint.get_user_total_points(current_user.id)
-    user_level = total_points // 100
-    next_level_points = (user_level + 1) * 100 - total_points
-    
-    week_ago = datetime.now() - timedelta(days=7)
-    weekly_points = EcoPoint.query.filter(
-        EcoPoint.user_id == current_user.id,
-        EcoPoint.date >= week_ago.date()
-    ).with_entities(db.func.sum(EcoPoint.points)).scalar() or 0
-    
-    weekly_tasks = EcoPoint.query.filter(
-        EcoPoint.user_id == current_user.id,
-        EcoPoint.date >= week_ago.date()
-    ).count()
-    
-    weekly_stats = {
-        'weekly_points': weekly_points,
-        'tasks_completed': weekly_tasks
-    }
+    # Daily tasks
+    daily_tasks = catalog.tasks
     
-    environmental_impact = calculate_environmental_impact(total_points)
+    # User statistics
+    summary = get_user_summary(current_user.id, recent_limit=0)
     
-    today = datetime.now().date()
-    completed_today = EcoPoint.query.filter_by(
-        user_id=current_user.id, 
-        date=today
-    ).all()
-    completed_task_ids = [point.task_type for point in completed_today]
+    # Environmental impact
+    environmental_impact = calculate_environmental_impact(summary['total_points'])
     
+    # Random tip
     random_tip = Tip.get_random_tip()
     
     return render_template('dashboard.html', 
                          tasks=daily_tasks,
-                         total_points=total_points,
-                         user_level=user_level,
-                         next_level_points=next_level_points,
+                         total_points=summary['total_points'],
+                         user_level=summary['user_level'],
+                         next_level_points=summary['next_level_points'],
                          random_tip=random_tip,
-                         weekly_stats=weekly_stats,
+                         weekly_stats=summary['weekly_stats'],
                          environmental_impact=environmental_impact,
-                         completed_task_ids=completed_task_ids,
+                         completed_task_ids=summary['completed_task_ids'],
                          now=datetime.now())
 
-@app.route('/complete_task', methods=['POST'])
 @login_required
 def complete_task():
     try:
-        task_id = request.json.get('task_id')
-        task_points = request.json.get('points')
+        task_type = f"task_{request.json.get('task_id')}"
+        task = catalog.tasks_by_type.get(task_type)
+        if not task:
+            return jsonify({
+                'success': False,
+                'message': 'Bunday topshiriq mavjud emas'
+            }), 400
         
+        # Ball mijozdan emas, katalogdan olinadi. (user_id, date, task_type) unique
+        # indeksi bir kunda takroriy bajarishni parallel so'rovlarda ham to'xtatadi
         today = datetime.now().date()
-        existing_task = EcoPoint.query.filter_by(
-            user_id=current_user.id,
-            date=today,
-            task_type=f"task_{task_id}"
-        ).first()
+        inserted = db.session.execute(
+            insert_or_ignore(db.session, EcoPoint).values(
+                user_id=current_user.id,
+                date=today,
+                points=task['points'],
+                task_type=task_type
+            )
+        ).rowcount
         
-        if existing_task:
+        if not inserted:
+            db.session.rollback()
             return jsonify({
                 'success': False,
                 'message': 'Siz bugun bu topshiriqni allaqachon bajardingiz!'
             })
         
-        new_point = EcoPoint(
-            user_id=current_user.id,
-            points=task_points,
-            task_type=f"task_{task_id}"
-        )
-        db.session.add(new_point)
-        db.session.commit()
+        total_points = UserStats.record_task(current_user.id, task['points'], today)
+        DailyRollup.record([(today, current_user.id, task_type, {'points': task['points'], 'task_count': 1})])
         
-        total_points = EcoPoint.get_user_total_points(current_user.id)
-        badge_name = Badge.assign_badge(current_user.id, total_points)
+        # Check for new badges (faqat yangi chegara kesib o'tilganda)
+        badges_earned = []
+        previous_points = total_points - task['points']
+        if len(catalog.reached_badges(total_points)) > len(catalog.reached_badges(previous_points)):
+            badges_earned = Badge.assign_badge(current_user.id, total_points)
+        db.session.commit()
+        cache.invalidate_tags(f'user:{current_user.id}')
         
         return jsonify({
             'success': True,
             'total_points': total_points,
-            'badge_earned': badge_name,
-            'message': f'Tabriklaymiz! +{task_points} ball qo\'lga kiritdingiz!'
+            'badge_earned': badges_earned[-1] if badges_earned else None,
+            'badges_earned': badges_earned,
+            'message': f'Tabriklaymiz! +{task["points"]} ball qo\'lga kiritdingiz!'
         })
         
     except Exception as e:
@@ -417,261 +539,334 @@ def complete_task():
             'message': 'Xatolik yuz berdi. Iltimos, qayta urinib ko\'ring.'
         })
 
-@app.route('/profile')
+def parse_batch_item(item, today):
+    """Batch elementini tekshirish; (task_type, task, date) yoki xato matnini qaytaradi"""
+    if not isinstance(item, dict):
+        return 'Element obyekt bo\'lishi kerak'
+    
+    task_type = f"task_{item.get('task_id')}"
+    task = catalog.tasks_by_type.get(task_type)
+    if not task:
+        return 'Bunday topshiriq mavjud emas'
+    
+    completed_at = item.get('completed_at')
+    if completed_at is None:
+        activity_date = today
+    else:
+        try:
+            timestamp = datetime.fromisoformat(str(completed_at))
+        except ValueError:
+            return 'completed_at ISO 8601 formatida bo\'lishi kerak'
+        activity_date = (timestamp.astimezone() if timestamp.tzinfo else timestamp).date()
+    
+    if activity_date > today:
+        return 'Kelajakdagi sana qabul qilinmaydi'
+    if (today - activity_date).days > BATCH_MAX_AGE_DAYS:
+        return f'{BATCH_MAX_AGE_DAYS} kundan eski topshiriqlar qabul qilinmaydi'
+    
+    return task_type, task, activity_date
+
 @login_required
-def profile():
+def eco_points_batch():
+    """Oflayn bajarilgan topshiriqlarni bitta so'rovda qabul qilish.
+
+    Har bir element: {"task_id": 3, "completed_at": "2024-05-01T08:30:00+05:00"}.
+    Takroriy yuborish xavfsiz - allaqachon yozilgan topshiriqlar "duplicate" bo'ladi.
+    """
+    payload = request.get_json(silent=True)
+    items = payload.get('items') if isinstance(payload, dict) else payload
+    if not isinstance(items, list):
+        return jsonify({'success': False, 'message': 'items ro\'yxati kerak'}), 400
+    if len(items) > BATCH_MAX_ITEMS:
+        return jsonify({
+            'success': False,
+            'message': f'Bir so\'rovda ko\'pi bilan {BATCH_MAX_ITEMS} ta element'
+        }), 413
+    
+    today = datetime.now().date()
+    results = []
+    candidates = {}
+    for index, item in enumerate(items):
+        parsed = parse_batch_item(item, today)
+        if isinstance(parsed, str):
+            results.append({'index': index, 'status': 'invalid', 'message': parsed})
+            continue
+        
+        task_type, task, activity_date = parsed
+        result = {'index': index, 'task_id': task['id'], 'date': activity_date.isoformat()}
+        results.append(result)
+        if (activity_date, task_type) in candidates:
+            result['status'] = 'duplicate'
+        else:
+            candidates[(activity_date, task_type)] = (task, result)
+    
     try:
         total_points = EcoPoint.get_user_total_points(current_user.id)
-        user_level = total_points // 100
+        badges_earned = []
+        created = []
+        if candidates:
+            # Faqat haqiqatda yozilgan qatorlar qaytadi - parallel so'rov (masalan qayta
+            # yuborish) oldinroq yozgan qatorlar "duplicate" bo'ladi va ikki marta sanalmaydi
+            created = db.session.execute(
+                insert_or_ignore(db.session, EcoPoint)
+                .returning(EcoPoint.date, EcoPoint.task_type, EcoPoint.points),
+                [{
+                    'user_id': current_user.id,
+                    'date': activity_date,
+                    'task_type': task_type,
+                    'points': task['points']
+                } for (activity_date, task_type), (task, _) in candidates.items()]
+            ).all()
+        
+        created_keys = {(activity_date, task_type) for activity_date, task_type, _ in created}
+        for key, (task, result) in candidates.items():
+            if key in created_keys:
+                result['status'] = 'created'
+                result['points'] = task['points']
+            else:
+                result['status'] = 'duplicate'
+        
+        if created:
+            # Yangi faol kunlar: shu kunlarda boshqa (oldin yozilgan) topshiriq bo'lmaganlari
+            new_dates = {activity_date for activity_date, _ in created_keys}
+            active_dates = {
+                activity_date for activity_date, task_type in db.session.execute(
+                    db.select(EcoPoint.date, EcoPoint.task_type).where(
+                        EcoPoint.user_id == current_user.id,
+                        EcoPoint.date.in_(new_dates)
+                    )
+                ).tuples()
+                if (activity_date, task_type) not in created_keys
+            }
+            # UserStats -> DailyRollup: complete_task bilan bir xil qulflash tartibi
+            total_points = UserStats.record_batch(
+                current_user.id,
+                sum(points for _, _, points in created),
+                len(created),
+                len(new_dates - active_dates),
+                max(new_dates)
+            )
+            DailyRollup.record(
+                (activity_date, current_user.id, task_type, {'points': points, 'task_count': 1})
+                for activity_date, task_type, points in created
+            )
+            badges_earned = Badge.assign_badge(current_user.id, total_points)
+        db.session.commit()
+        cache.invalidate_tags(f'user:{current_user.id}')
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Batch error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Xatolik yuz berdi. Iltimos, qayta urinib ko\'ring.'
+        }), 500
+    
+    return jsonify({
+        'success': True,
+        'created': len(created),
+        'total_points': total_points,
+        'badges_earned': badges_earned,
+        'results': results
+    })
+
+@login_required
+@read_replica
+def profile():
+    try:
+        summary = get_user_summary(current_user.id)
+        total_points = summary['total_points']
+        
+        # Badges
+        badges = Badge.for_user(current_user.id)
+        
+        # Today's tasks
+        today_tasks = []
+        for task in summary['today_activities']:
+            task_meta = catalog.task(task.task_type)
+            today_tasks.append({
+                'icon': task_meta['icon'],
+                'name': task_meta['name'],
+                'time': 'Bugun',
+                'points': task.points
+            })
+        
+        # Today's points
+        today_points = summary['today_points']
+        
+        # Today's environmental impact
+        today_impact = calculate_environmental_impact(today_points)
+        today_comparisons = get_impact_comparisons(today_impact)
+        
+        # Recent activities
+        recent_activities = []
+        for activity in summary['recent_activities']:
+            task_meta = catalog.task(activity.task_type)
+            recent_activities.append({
+                'date': activity.date,
+                'icon': task_meta['icon'] if task_meta['id'] else '✅',
+                'description': task_meta['activity'],
+                'points': activity.points
+            })
+        
+        # Total environmental impact
+        total_impact = calculate_environmental_impact(total_points)
+        total_comparisons = get_impact_comparisons(total_impact)
+        
+        # Next badge info
+        next_badge = get_next_badge_info(total_points)
         
-        badges = Badge.query.filter_by(user_id=current_user.id).order_by(Badge.earned_date.desc()).all()
+        # Last activity
+        last_activity = "Bugun"
+        last_activity_date = summary['last_activity_date']
+        if last_activity_date:
+            if last_activity_date == datetime.now().date():
+                last_activity = "Bugun"
+            else:
+                days_ago = (datetime.now().date() - last_activity_date).days
+                last_activity = f"{days_ago} kun oldin"
         
         return render_template('profile.html',
-                            user=current_user,
-                            total_points=total_points,
-                            user_level=user_level,
-                            badges=badges)
+                             user=current_user,
+                             total_points=total_points,
+                             user_level=summary['user_level'],
+                             progress_percentage=summary['progress_percentage'],
+                             next_level_points=summary['next_level_points'],
+                             badges=badges,
+                             active_days=summary['active_days'],
+                             today_date=datetime.now().strftime('%Y-%m-%d'),
+                             today_tasks=today_tasks,
+                             today_points=today_points,
+                             today_co2=today_impact['co2_saved'],
+                             today_water=int(today_impact['water_saved']),
+                             today_plastic=today_impact['plastic_saved'],
+                             co2_car_km=today_comparisons['co2_car_km'],
+                             water_showers=today_comparisons['water_showers'],
+                             plastic_bottles=today_comparisons['plastic_bottles'],
+                             recent_activities=recent_activities,
+                             total_co2_saved=total_impact['co2_saved'],
+                             total_water_saved=int(total_impact['water_saved']),
+                             total_plastic_saved=total_impact['plastic_saved'],
+                             total_energy_saved=int(total_impact['energy_saved']),
+                             total_co2_trees=round(total_impact['co2_saved'] / 21) if total_impact['co2_saved'] > 0 else 0,
+                             total_water_showers=round(total_impact['water_saved'] / 65) if total_impact['water_saved'] > 0 else 0,
+                             total_plastic_bottles=round(total_impact['plastic_saved'] / 0.05) if total_impact['plastic_saved'] > 0 else 0,
+                             total_energy_homes=round(total_impact['energy_saved'] / 30) if total_impact['energy_saved'] > 0 else 0,
+                             next_badge=next_badge,
+                             last_activity=last_activity)
                              
     except Exception as e:
         print(f"Profile error: {str(e)}")
         flash('Profilni yuklashda xatolik yuz berdi', 'error')
         return redirect(url_for('dashboard'))
 
-@app.route('/stats')
 @login_required
+@read_replica
 def stats():
+    """Statistika sahifasi"""
     try:
-        total_points = EcoPoint.get_user_total_points(current_user.id)
-        user_level = total_points // 100
-        
-        week_ago = datetime.now() - timedelta(days=7)
-        weekly_points = EcoPoint.query.filter(
-            EcoPoint.user_id == current_user.id,
-            EcoPoint.date >= week_ago.date()
-        ).with_entities(db.func.sum(EcoPoint.points)).scalar() or 0
+        # Umumiy va haftalik statistikalar
+        summary = get_user_summary(current_user.id, recent_limit=0)
         
-        weekly_tasks = EcoPoint.query.filter(
-            EcoPoint.user_id == current_user.id,
-            EcoPoint.date >= week_ago.date()
-        ).count()
+        # Atrof-muhitga ta'sir
+        environmental_impact = calculate_environmental_impact(summary['total_points'])
         
-        weekly_stats = {
-            'weekly_points': weekly_points,
-            'tasks_completed': weekly_tasks
-        }
-        
-        environmental_impact = calculate_environmental_impact(total_points)
-        badges = Badge.query.filter_by(user_id=current_user.id).all()
+        # Yutuqlar
+        badges = Badge.for_user(current_user.id)
         
         return render_template('stats.html',
-                            total_points=total_points,
-                            user_level=user_level,
-                            weekly_stats=weekly_stats,
-                            environmental_impact=environmental_impact,
-                            badges=badges)
+                             total_points=summary['total_points'],
+                             user_level=summary['user_level'],
+                             weekly_stats=summary['weekly_stats'],
+                             environmental_impact=environmental_impact,
+                             badges=badges)
                              
     except Exception as e:
         print(f"Stats error: {str(e)}")
         flash('Statistikani yuklashda xatolik yuz berdi', 'error')
         return redirect(url_for('dashboard'))
 
-@app.route('/logout')
 @login_required
 def logout():
     logout_user()
     flash('Siz tizimdan muvaffaqiyatli chiqdingiz', 'info')
     return redirect(url_for('index'))
 
-@app.route('/get_tip')
 @login_required
 def get_tip():
     random_tip = Tip.get_random_tip()
     return jsonify({'tip': random_tip})
 
-# ===== BLOG ROUTES =====
-@app.route('/blog')
-def blog_index():
-    try:
-        posts = BlogPost.query.filter_by(is_published=True)\
-            .order_by(BlogPost.created_at.desc())\
-            .all()
-        return render_template('blog.html', posts=posts)
-    except Exception as e:
-        print(f"Blog error: {str(e)}")
-        flash('Blog sahifasini yuklashda xatolik', 'error')
-        return redirect(url_for('index'))
-
-@app.route('/blog/create', methods=['GET', 'POST'])
-@login_required
-def blog_create():
-    if request.method == 'POST':
-        try:
-            title = request.form.get('title')
-            content = request.form.get('content')
-            
-            if not title or not content:
-                flash('Sarlavha va mazumni to\'ldiring', 'error')
-                return redirect(url_for('blog_create'))
-            
-            post = BlogPost(
-                title=title,
-                content=content,
-                author_id=current_user.id
-            )
-            
-            db.session.add(post)
-            db.session.commit()
-            
-            flash('Post muvaffaqiyatli yaratildi!', 'success')
-            return redirect(url_for('blog_index'))
-            
-        except Exception as e:
-            db.session.rollback()
-            flash('Post yaratishda xatolik yuz berdi', 'error')
-            return redirect(url_for('blog_create'))
-    
-    return render_template('blog_create.html')
-
-# ===== ADMIN ROUTES =====
-@app.route('/admin-login', methods=['GET', 'POST'])
-def admin_login():
-    # Agar admin allaqachon kirgan bo'lsa, admin paneliga yo'naltirish
-    if current_user.is_authenticated and current_user.is_admin:
-        return redirect(url_for('admin_dashboard'))
-        
-    if request.method == 'POST':
-        try:
-            email = request.form.get('email', '').strip().lower()
-            password = request.form.get('password', '')
-            
-            user = User.query.filter_by(email=email).first()
-            
-            if user and check_password_hash(user.password_hash, password):
-                if user.is_admin:
-                    login_user(user)
-                    flash(f'Xush kelibsiz, Admin {user.name}!', 'success')
-                    return redirect(url_for('admin_dashboard'))
-                else:
-                    flash('Sizda admin huquqi yo\'q. Faqat admin foydalanuvchilari kirishi mumkin.', 'error')
-            else:
-                flash('Email yoki parol noto\'g\'ri', 'error')
-                
-        except Exception as e:
-            print(f"Admin login error: {str(e)}")
-            flash('Kirishda xatolik yuz berdi. Iltimos, qayta urinib ko\'ring.', 'error')
-    
-    return render_template('admin_login.html')
-
-@app.route('/admin')
-@login_required
-def admin_dashboard():
-    if not current_user.is_admin:
-        flash('Sizda admin huquqi yo\'q', 'error')
-        return redirect(url_for('index'))
-    
-    try:
-        # Admin statistikasi
-        total_users = User.query.count()
-        total_posts = BlogPost.query.count()
-        total_comments = PostComment.query.count()
-        total_eco_points = EcoPoint.query.count()
-        
-        stats = {
-            'total_users': total_users,
-            'total_posts': total_posts,
-            'total_comments': total_comments,
-            'total_eco_points': total_eco_points
-        }
-        
-        # So'nggi faolliklar
-        recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
-        recent_posts = BlogPost.query.order_by(BlogPost.created_at.desc()).limit(5).all()
-        
-        return render_template('admin_dashboard.html', 
-                             stats=stats,
-                             recent_users=recent_users,
-                             recent_posts=recent_posts)
-    except Exception as e:
-        print(f"Admin dashboard error: {str(e)}")
-        flash('Admin panelini yuklashda xatolik', 'error')
-        return redirect(url_for('index'))
-
-@app.route('/admin/users')
-@login_required
-def admin_users():
-    if not current_user.is_admin:
-        flash('Sizda admin huquqi yo\'q', 'error')
-        return redirect(url_for('index'))
-    
-    try:
-        users = User.query.all()
-        return render_template('admin_users.html', users=users)
-    except Exception as e:
-        print(f"Admin users error: {str(e)}")
-        flash('Foydalanuvchilarni yuklashda xatolik', 'error')
-        return redirect(url_for('admin_dashboard'))
-
-@app.route('/admin/posts')
-@login_required
-def admin_posts():
-    if not current_user.is_admin:
-        flash('Sizda admin huquqi yo\'q', 'error')
-        return redirect(url_for('index'))
-    
-    try:
-        posts = BlogPost.query.all()
-        return render_template('admin_posts.html', posts=posts)
-    except Exception as e:
-        print(f"Admin posts error: {str(e)}")
-        flash('Postlarni yuklashda xatolik', 'error')
-        return redirect(url_for('admin_dashboard'))
-
-@app.route('/admin/comments')
-@login_required
-def admin_comments():
-    if not current_user.is_admin:
-        flash('Sizda admin huquqi yo\'q', 'error')
-        return redirect(url_for('index'))
-    
-    try:
-        comments = PostComment.query.all()
-        return render_template('admin_comments.html', comments=comments)
-    except Exception as e:
-        print(f"Admin comments error: {str(e)}")
-        flash('Kommentlarni yuklashda xatolik', 'error')
-        return redirect(url_for('admin_dashboard'))
-
-@app.route('/admin/eco-points')
-@login_required
-def admin_eco_points():
-    if not current_user.is_admin:
-        flash('Sizda admin huquqi yo\'q', 'error')
-        return redirect(url_for('index'))
-    
-    try:
-        eco_points = EcoPoint.query.all()
-        return render_template('admin_eco_points.html', eco_points=eco_points)
-    except Exception as e:
-        print(f"Admin eco points error: {str(e)}")
-        flash('Eco ballarni yuklashda xatolik', 'error')
-        return redirect(url_for('admin_dashboard'))
-
-# Error handlers
-@app.errorhandler(404)
 def not_found_error(error):
-    return render_template('404.html'), 404
+    return render_template('errors/404.html'), 404
 
-@app.errorhandler(500)
 def internal_error(error):
     db.session.rollback()
-    return render_template('500.html'), 500
+    return render_template('errors/500.html'), 500
 
-if __name__ == '__main__':
+# ===== ASOSIY ROUTELAR =====
+MAIN_ROUTES = [
+    ('/', index, ['GET']),
+    ('/register', register, ['GET', 'POST']),
+    ('/login', login, ['GET', 'POST']),
+    ('/dashboard', dashboard, ['GET']),
+    ('/complete_task', complete_task, ['POST']),
+    ('/api/eco-points/batch', eco_points_batch, ['POST']),
+    ('/profile', profile, ['GET']),
+    ('/stats', stats, ['GET']),
+    ('/logout', logout, ['GET']),
+    ('/get_tip', get_tip, ['GET']),
+]
+
+ERROR_HANDLERS = [
+    (404, not_found_error),
+    (500, internal_error),
+]
+
+def has_endpoint(endpoint):
+    """Shablonlar uchun: endpoint ro'yxatdan o'tganmi (o'chirilgan blueprint havolalari yashiriladi)"""
+    return endpoint in current_app.view_functions
+
+# Blueprint'lar faqat config.BLUEPRINTS'da yoqilganda import qilinadi
+BLUEPRINTS = {
+    'blog': 'blog_routes:blog_bp',
+    'admin': 'admin_routes:admin_bp',
+    'quiz': 'quiz_routes:quiz_bp'
+}
+
+CLI_COMMANDS = [
+    upgrade_db_command,
+    rebuild_rollup_command,
+    reconcile_stats_command,
+    backfill_badges_command,
+    rebuild_quiz_stats_command
+]
+
+def create_app(config=Config):
+    """Ilova fabrikasi: config klassi yoki obyektidan yangi Flask ilovasini yaratish"""
+    app = Flask(__name__)
+    app.config.from_object(config)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options_for(
+        app.config['SQLALCHEMY_DATABASE_URI'], app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    )
+    
+    db.init_app(app)
     with app.app_context():
-        init_db()
-    print("🌿 EcoTrack ilovasi ishga tushmoqda...")
-    print("📍 Manzil: http://127.0.0.1:5000")
-    print("👤 Oddiy foydalanuvchi: test@test.com / test123")
-    print("🔐 Admin login: admin@ecotrack.com / admin123")
-    print("🔗 Admin panel: http://127.0.0.1:5000/admin-login")
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+        for engine in db.engines.values():
+            set_sqlite_pragmas(engine, app.config['SQLITE_PRAGMAS'])
+    cache.init_app(app)
+    cache.fill_context = primary_reads
+    login_manager.init_app(app)
+    
+    for rule, view, methods in MAIN_ROUTES:
+        app.add_url_rule(rule, view_func=view, methods=methods)
+    app.jinja_env.globals['has_endpoint'] = has_endpoint
+    for code, handler in ERROR_HANDLERS:
+        app.register_error_handler(code, handler)
+    for command in CLI_COMMANDS:
+        app.cli.add_command(command)
+    
+    for name in app.config['BLUEPRINTS']:
+        app.register_blueprint(import_string(BLUEPRINTS[name]))
+    
+    return app
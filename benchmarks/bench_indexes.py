@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Indekslar benchmarki: 1M EcoPoint qatorli bazada so'rov rejasi va vaqti
+
+    python benchmarks/bench_indexes.py [--rows 1000000] [--users 1000]
+
+Avval indekssiz jadval yaratiladi va to'ldiriladi, keyin issiq so'rovlar
+o'lchanadi, `upgrade_schema` ishga tushiriladi va o'lchov takrorlanadi.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.schema import CreateTable
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import db
+from migrations import upgrade_schema
+
+HOT_QUERIES = {
+    'total_points': (
+        'SELECT SUM(points) FROM eco_point WHERE user_id = :user_id', {}
+    ),
+    'weekly_points': (
+        'SELECT SUM(points), COUNT(*) FROM eco_point WHERE user_id = :user_id AND date >= :since', {}
+    ),
+    'task_done_today': (
+        'SELECT id FROM eco_point WHERE user_id = :user_id AND date = :today AND task_type = :task_type',
+        {'task_type': 'task_3'}
+    ),
+    'user_badges': (
+        'SELECT id FROM badge WHERE user_id = :user_id AND badge_name = :badge_name',
+        {'badge_name': 'Eco Friend'}
+    ),
+    'post_likes': (
+        'SELECT COUNT(*) FROM post_like WHERE post_id = :post_id', {}
+    ),
+    'user_like': (
+        'SELECT id FROM post_like WHERE user_id = :user_id AND post_id = :post_id', {}
+    ),
+    'blog_index': (
+        'SELECT id FROM blog_post WHERE is_published = 1 ORDER BY created_at DESC LIMIT 6', {}
+    ),
+}
+
+
+def seed(engine, rows, users):
+    """Indekssiz jadvallarni yaratib, tasodifiy ma'lumot bilan to'ldirish"""
+    rng = random.Random(42)
+    today = date.today()
+
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            conn.execute(CreateTable(table))
+
+        conn.exec_driver_sql(
+            'INSERT INTO user (id, name, email, password_hash) VALUES (?, ?, ?, ?)',
+            [(i, f'user{i}', f'user{i}@example.com', '-') for i in range(1, users + 1)]
+        )
+        conn.exec_driver_sql(
+            'INSERT INTO eco_point (user_id, date, points, task_type) VALUES (?, ?, ?, ?)',
+            [
+                (rng.randint(1, users),
+                 (today - timedelta(days=rng.randint(0, 730))).isoformat(),
+                 rng.choice((10, 12, 15, 20, 25)),
+                 f'task_{rng.randint(1, 5)}')
+                for _ in range(rows)
+            ]
+        )
+        conn.exec_driver_sql(
+            'INSERT INTO badge (user_id, badge_name) VALUES (?, ?)',
+            [(u, name) for u in range(1, users + 1)
+             for name in ('Green Starter', 'Eco Friend', 'Nature Guardian')]
+        )
+        conn.exec_driver_sql(
+            'INSERT INTO blog_post (id, title, content, author_id, created_at, is_published) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            [(i, f'Post {i}', '...', rng.randint(1, users), f'2024-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}', i % 10 != 0)
+             for i in range(1, 2001)]
+        )
+        conn.exec_driver_sql(
+            'INSERT OR IGNORE INTO post_like (user_id, post_id) VALUES (?, ?)',
+            [(rng.randint(1, users), rng.randint(1, 2000)) for _ in range(rows // 10)]
+        )
+        conn.exec_driver_sql('ANALYZE')
+
+
+def measure(engine, repeat):
+    """Har bir issiq so'rov uchun reja va o'rtacha vaqtni qaytarish"""
+    params = {
+        'user_id': 7,
+        'post_id': 42,
+        'today': date.today().isoformat(),
+        'since': (date.today() - timedelta(days=7)).isoformat(),
+    }
+    results = {}
+
+    with engine.connect() as conn:
+        for name, (sql, extra) in HOT_QUERIES.items():
+            bind = {**params, **extra}
+            plan = ' | '.join(
+                row[-1] for row in conn.execute(text('EXPLAIN QUERY PLAN ' + sql), bind)
+            )
+            started = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(text(sql), bind).fetchall()
+            elapsed_ms = (time.perf_counter() - started) / repeat * 1000
+            results[name] = (plan, elapsed_ms)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+
+        started = time.perf_counter()
+        seed(engine, args.rows, args.users)
+        print(f"Seeded {args.rows} eco_point rows in {time.perf_counter() - started:.1f}s\n")
+
+        before = measure(engine, args.repeat)
+        started = time.perf_counter()
+        changes = upgrade_schema(engine, db.metadata)
+        print(f"upgrade_schema: {len(changes)} changes in {time.perf_counter() - started:.1f}s\n")
+        with engine.begin() as conn:
+            conn.exec_driver_sql('ANALYZE')
+        after = measure(engine, args.repeat)
+
+    for name in HOT_QUERIES:
+        (plan_before, ms_before), (plan_after, ms_after) = before[name], after[name]
+        print(f"{name}: {ms_before:.3f} ms -> {ms_after:.3f} ms")
+        print(f"    before: {plan_before}")
+        print(f"    after:  {plan_after}")
+
+
+if __name__ == '__main__':
+    main()
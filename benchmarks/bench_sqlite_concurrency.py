@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+SQLite parallellik benchmarki: N yozuvchi x M o'quvchi jarayon, PRAGMA'larsiz va Config.SQLITE_PRAGMAS bilan
+
+    python benchmarks/bench_sqlite_concurrency.py [--writers 4] [--readers 4] [--seconds 5]
+
+Yozuvchilar /complete_task tranzaksiyasini takrorlaydi (EcoPoint INSERT + UserStats
+upsert), o'quvchilar dashboard so'rovlarini. Har bir jarayon alohida engine ochadi -
+gunicorn worker'lari kabi. Natijada soniyadagi operatsiyalar va "database is locked"
+xatolari soni chiqariladi.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from models import db, User, EcoPoint, UserStats
+from utils import set_sqlite_pragmas, upsert_increment
+
+USERS = 200
+# Oldingi holat: rollback-journal, kutishsiz va Python sqlite3 standart 5 s kutishi bilan
+BASELINE_PRAGMAS = {'journal_mode': 'DELETE', 'busy_timeout': 0}
+JOURNAL_PRAGMAS = {'journal_mode': 'DELETE'}
+
+
+def make_engine(path, pragmas):
+    engine = create_engine(f'sqlite:///{path}')
+    set_sqlite_pragmas(engine, pragmas)
+    return engine
+
+
+def seed(path, pragmas):
+    engine = make_engine(path, pragmas)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {'id': i, 'name': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': 'x'}
+            for i in range(1, USERS + 1)
+        ])
+    engine.dispose()
+
+
+def writer(path, pragmas, seconds, worker_id, results):
+    engine = make_engine(path, pragmas)
+    ops = errors = 0
+    day = date.today() - timedelta(days=worker_id * 100000)
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        user_id = ops % USERS + 1
+        if user_id == 1:
+            day -= timedelta(days=1)
+        try:
+            with engine.begin() as conn:
+                conn.execute(EcoPoint.__table__.insert().values(
+                    user_id=user_id, date=day, points=10, task_type='task_1'
+                ))
+                conn.execute(upsert_increment(conn, UserStats, ['user_id'], ['total_points', 'task_count']).values(
+                    user_id=user_id, total_points=10, task_count=1, active_days=1
+                ))
+            ops += 1
+        except OperationalError as error:
+            if 'locked' not in str(error):
+                raise
+            errors += 1
+    results.put(('writer', ops, errors))
+
+
+def reader(path, pragmas, seconds, worker_id, results):
+    engine = make_engine(path, pragmas)
+    ops = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        user_id = (ops + worker_id) % USERS + 1
+        try:
+            with engine.connect() as conn:
+                conn.execute(select(UserStats).where(UserStats.user_id == user_id)).first()
+                conn.execute(
+                    select(func.count(EcoPoint.id), func.sum(EcoPoint.points))
+                    .where(EcoPoint.user_id == user_id, EcoPoint.date >= date.today() - timedelta(days=7))
+                ).first()
+            ops += 1
+        except OperationalError as error:
+            if 'locked' not in str(error):
+                raise
+            errors += 1
+    results.put(('reader', ops, errors))
+
+
+def run(label, pragmas, writers, readers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        seed(path, pragmas)
+
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=target, args=(path, pragmas, seconds, i, results))
+            for target, count in ((writer, writers), (reader, readers))
+            for i in range(count)
+        ]
+        for process in processes:
+            process.start()
+        totals = {'writer': [0, 0], 'reader': [0, 0]}
+        for _ in processes:
+            kind, ops, errors = results.get()
+            totals[kind][0] += ops
+            totals[kind][1] += errors
+        for process in processes:
+            process.join()
+
+    print(f"{label:<10} "
+          f"writes {totals['writer'][0] / seconds:8.0f}/s ({totals['writer'][1]} locked)   "
+          f"reads {totals['reader'][0] / seconds:8.0f}/s ({totals['reader'][1]} locked)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers x {args.readers} readers, {args.seconds:g} s")
+    run('baseline', BASELINE_PRAGMAS, args.writers, args.readers, args.seconds)
+    run('journal', JOURNAL_PRAGMAS, args.writers, args.readers, args.seconds)
+    run('tuned', Config.SQLITE_PRAGMAS, args.writers, args.readers, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
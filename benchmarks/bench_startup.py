@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Ishga tushish benchmarki: gunicorn worker sovuq starti (import + ilova yaratish)
+
+    python benchmarks/bench_startup.py [--repeat 10] [--code "from app import create_app; create_app()"]
+
+Har bir o'lchov yangi `python -X importtime` jarayonida bajariladi. Devor vaqti,
+jami import vaqti va eng qimmat loyiha modullari chiqariladi. Eski daraxtni
+o'lchash uchun --code bilan o'sha daraxt kirish nuqtasini bering (masalan
+"import app, models").
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_MODULES = {
+    os.path.splitext(name)[0] for name in os.listdir(ROOT) if name.endswith('.py')
+}
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def run_once(code):
+    """Bitta sovuq start: (devor vaqti ms, {modul: cumulative us}, jami import us)"""
+    script = f"import time; started = time.perf_counter(); {code}; print((time.perf_counter() - started) * 1000)"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    modules, total = {}, 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        if indent == 1:
+            total += cumulative
+        if name in PROJECT_MODULES:
+            modules[name] = cumulative
+    return float(result.stdout.strip().splitlines()[-1]), modules, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--code', default='from app import create_app; create_app()')
+    args = parser.parse_args()
+
+    runs = [run_once(args.code) for _ in range(args.repeat)]
+    wall = [ms for ms, _, _ in runs]
+    totals = [total / 1000 for _, _, total in runs]
+
+    print(f"code: {args.code}")
+    print(f"wall (import + app): median {statistics.median(wall):.1f} ms, min {min(wall):.1f} ms")
+    print(f"import time total:   median {statistics.median(totals):.1f} ms")
+    print("project modules (cumulative, median):")
+    names = set().union(*(modules for _, modules, _ in runs))
+    medians = {name: statistics.median(m.get(name, 0) for _, m, _ in runs) / 1000 for name in names}
+    for name, ms in sorted(medians.items(), key=lambda item: -item[1]):
+        print(f"    {name:<16} {ms:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,76 +1,170 @@
 from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
 from flask_login import login_required, current_user
-from app import db
-from models import BlogPost, PostLike, PostComment
-from datetime import datetime
+
+from models import db, read_replica, BlogPost, PostLike, PostComment
+from utils import keyset_paginate
 
 blog_bp = Blueprint('blog', __name__, url_prefix='/blog')
 
-@blog_bp.route('/')
+# Blog sahifa o'lchami va post sahifasidagi izohlar porsiyasi (kursorli sahifalash)
+BLOG_PAGE_SIZE = 6
+BLOG_COMMENTS_PAGE_SIZE = 20
+
+@blog_bp.route('')
+@read_replica
 def blog_index():
-    page = request.args.get('page', 1, type=int)
-    posts = BlogPost.query.filter_by(is_published=True)\
-        .order_by(BlogPost.created_at.desc())\
-        .paginate(page=page, per_page=6)
+    """Blog asosiy sahifasi"""
+    posts = keyset_paginate(
+        BlogPost.query.filter_by(is_published=True).options(db.joinedload(BlogPost.author)),
+        BlogPost.created_at, BlogPost.id,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=BLOG_PAGE_SIZE
+    )
+    BlogPost.attach_counts(posts.items)
     return render_template('blog/blog.html', posts=posts)
 
 @blog_bp.route('/post/<int:post_id>')
 def blog_post(post_id):
+    """Blog post sahifasi"""
     post = BlogPost.query.get_or_404(post_id)
-    return render_template('blog/blog_post.html', post=post)
+    BlogPost.attach_counts([post])
+    comments = PostComment.approved_page(post_id, per_page=BLOG_COMMENTS_PAGE_SIZE)
+    
+    liked = False
+    if current_user.is_authenticated:
+        liked = PostLike.query.filter_by(user_id=current_user.id, post_id=post_id).first() is not None
+    
+    return render_template('blog/blog_post.html', post=post, comments=comments, liked=liked)
+
+@blog_bp.route('/post/<int:post_id>/comments')
+def blog_post_comments(post_id):
+    """"Ko'proq izohlar" uchun keyingi porsiya (JSON)"""
+    comments = PostComment.approved_page(
+        post_id,
+        after=request.args.get('after'),
+        per_page=BLOG_COMMENTS_PAGE_SIZE
+    )
+    return jsonify({
+        'comments': [{
+            'id': comment.id,
+            'author': comment.user.name,
+            'content': comment.content,
+            'created_at': comment.created_at.strftime('%Y-%m-%d %H:%M')
+        } for comment in comments],
+        'next_cursor': comments.next_cursor
+    })
 
 @blog_bp.route('/create', methods=['GET', 'POST'])
 @login_required
 def blog_create():
+    """Yangi post yaratish"""
     if request.method == 'POST':
-        title = request.form.get('title')
-        content = request.form.get('content')
-        
-        post = BlogPost(
-            title=title,
-            content=content,
-            author_id=current_user.id
-        )
-        
-        db.session.add(post)
-        db.session.commit()
-        
-        flash('Post muvaffaqiyatli yaratildi!', 'success')
-        return redirect(url_for('blog.blog_index'))
+        try:
+            title = request.form.get('title')
+            content = request.form.get('content')
+            
+            if not title or not content:
+                flash('Sarlavha va mazumni to\'ldiring', 'error')
+                return redirect(url_for('.blog_create'))
+            
+            post = BlogPost(
+                title=title,
+                content=content,
+                author_id=current_user.id
+            )
+            
+            db.session.add(post)
+            db.session.commit()
+            
+            flash('Post muvaffaqiyatli yaratildi!', 'success')
+            return redirect(url_for('.blog_index'))
+            
+        except Exception as e:
+            db.session.rollback()
+            flash('Post yaratishda xatolik yuz berdi', 'error')
+            return redirect(url_for('.blog_create'))
     
     return render_template('blog/blog_create.html')
 
+@blog_bp.route('/post/<int:post_id>/edit', methods=['GET', 'POST'])
+@login_required
+def blog_edit(post_id):
+    """Postni tahrirlash (faqat muallif)"""
+    post = BlogPost.query.get_or_404(post_id)
+    if post.author_id != current_user.id:
+        flash('Faqat o\'z postingizni tahrirlay olasiz', 'error')
+        return redirect(url_for('.blog_post', post_id=post_id))
+    
+    if request.method == 'POST':
+        try:
+            title = request.form.get('title')
+            content = request.form.get('content')
+            
+            if not title or not content:
+                flash('Sarlavha va mazumni to\'ldiring', 'error')
+                return redirect(url_for('.blog_edit', post_id=post_id))
+            
+            post.title = title
+            post.content = content
+            db.session.commit()
+            
+            flash('Post muvaffaqiyatli yangilandi!', 'success')
+            return redirect(url_for('.blog_post', post_id=post_id))
+            
+        except Exception as e:
+            db.session.rollback()
+            flash('Postni yangilashda xatolik yuz berdi', 'error')
+            return redirect(url_for('.blog_edit', post_id=post_id))
+    
+    BlogPost.attach_counts([post])
+    return render_template('blog/blog_edit.html', post=post)
+
 @blog_bp.route('/post/<int:post_id>/like', methods=['POST'])
 @login_required
 def like_post(post_id):
-    existing_like = PostLike.query.filter_by(
-        user_id=current_user.id, 
-        post_id=post_id
-    ).first()
-    
-    if existing_like:
-        db.session.delete(existing_like)
-        db.session.commit()
-        return jsonify({'liked': False, 'likes_count': PostLike.query.filter_by(post_id=post_id).count()})
-    else:
-        like = PostLike(user_id=current_user.id, post_id=post_id)
-        db.session.add(like)
+    """Postga like bosish"""
+    try:
+        result = PostLike.toggle(current_user.id, post_id)
+        if result is None:
+            db.session.rollback()
+            return jsonify({'error': 'Post topilmadi'}), 404
+        
         db.session.commit()
-        return jsonify({'liked': True, 'likes_count': PostLike.query.filter_by(post_id=post_id).count()})
+        liked, likes_count = result
+        return jsonify({
+            'liked': liked, 
+            'likes_count': likes_count
+        })
+            
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Xatolik yuz berdi'}), 500
 
 @blog_bp.route('/post/<int:post_id>/comment', methods=['POST'])
 @login_required
 def add_comment(post_id):
-    content = request.form.get('content')
-    
-    comment = PostComment(
-        content=content,
-        user_id=current_user.id,
-        post_id=post_id
-    )
-    
-    db.session.add(comment)
-    db.session.commit()
-    
-    flash('Izoh muvaffaqiyatli qo\'shildi!', 'success')
-    return redirect(url_for('blog.blog_post', post_id=post_id))
\ No newline at end of file
+    """Postga comment qo'shish"""
+    try:
+        content = request.form.get('content')
+        
+        if not content:
+            flash('Izoh matnini kiriting', 'error')
+            return redirect(url_for('.blog_post', post_id=post_id))
+        
+        comment = PostComment(
+            content=content,
+            user_id=current_user.id,
+            post_id=post_id
+        )
+        
+        db.session.add(comment)
+        db.session.commit()
+        
+        flash('Izoh muvaffaqiyatli qo\'shildi!', 'success')
+        return redirect(url_for('.blog_post', post_id=post_id))
+        
+    except Exception as e:
+        db.session.rollback()
+        flash('Izoh qo\'shishda xatolik yuz berdi', 'error')
+        return redirect(url_for('.blog_post', post_id=post_id))
@@ -0,0 +1,202 @@
+"""
+Ilova keshi: jarayon ichidagi LRU/TTL (standart) yoki umumiy Redis backend
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+
+
+class LocalBackend:
+    """Jarayon ichidagi chegaralangan LRU kesh (TTL bilan)"""
+
+    def __init__(self, max_size=1000, tag_ttl=86400):
+        self.max_size = max_size
+        self.tag_ttl = tag_ttl
+        self._data = OrderedDict()
+        # Teg versiyalari LRU'dan tashqarida - siqib chiqarilsa eski yozuvlar qaytib kelardi.
+        # Oxirgi oshirilish tartibida; tag_ttl o'tgach o'chiriladi (teglangan yozuvlar undan oldin eskiradi)
+        self._counters = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] is not None and item[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item
+
+    def set(self, key, item, ttl):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at,) + item
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def _prune_counters(self, now):
+        while self._counters:
+            expires_at, _ = next(iter(self._counters.values()))
+            if expires_at > now:
+                break
+            self._counters.popitem(last=False)
+
+    def incr(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._prune_counters(now)
+            _, value = self._counters.pop(key, (None, 0))
+            self._counters[key] = (now + self.tag_ttl, value + 1)
+            return value + 1
+
+    def get_counters(self, keys):
+        now = time.monotonic()
+        with self._lock:
+            self._prune_counters(now)
+            return [self._counters.get(key, (None, 0))[1] for key in keys]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._counters.clear()
+
+
+class RedisBackend:
+    """Redis bilan mos serverdagi umumiy kesh (bir nechta worker uchun)"""
+
+    def __init__(self, url, prefix='ecotrack:', tag_ttl=86400):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND='redis' uchun `pip install redis` kerak")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.tag_ttl = tag_ttl
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        return (None,) + pickle.loads(raw)
+
+    def set(self, key, item, ttl):
+        self.client.set(self.prefix + key, pickle.dumps(item), ex=ttl or None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key):
+        with self.client.pipeline() as pipe:
+            pipe.incr(self.prefix + key)
+            pipe.expire(self.prefix + key, self.tag_ttl)
+            return pipe.execute()[0]
+
+    def get_counters(self, keys):
+        if not keys:
+            return []
+        return [int(value or 0) for value in self.client.mget([self.prefix + key for key in keys])]
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+class Cache:
+    """Backend ustidagi umumiy interfeys: TTL, teglar bo'yicha bekor qilish, hit/miss hisoblagichlari.
+
+    Teglar versiyalanadi: yozuv saqlanganda uning teglari versiyasi ham saqlanadi,
+    invalidate_tags() esa versiyani oshiradi - eski yozuvlar o'qilganda miss bo'ladi.
+    Teg versiyalari tag_ttl dan keyin o'chiriladi, shuning uchun teglangan yozuvlar
+    tag_ttl dan uzoq yashamaydi.
+
+    fill_context - get_or_set() factory'si ichida ishlaydigan kontekst menejeri
+    (masalan keshni replika o'rniga asosiy bazadan to'ldirish uchun).
+    """
+
+    def __init__(self, backend=None, default_ttl=300, fill_context=None):
+        self.backend = backend or LocalBackend()
+        self.default_ttl = default_ttl
+        self.fill_context = fill_context or nullcontext
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        app.config.setdefault('CACHE_BACKEND', 'local')
+        app.config.setdefault('CACHE_DEFAULT_TTL', 300)
+        app.config.setdefault('CACHE_MAX_SIZE', 1000)
+        app.config.setdefault('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+        app.config.setdefault('CACHE_TAG_TTL', 86400)
+
+        if app.config['CACHE_BACKEND'] == 'redis':
+            self.backend = RedisBackend(app.config['CACHE_REDIS_URL'], tag_ttl=app.config['CACHE_TAG_TTL'])
+        else:
+            self.backend = LocalBackend(app.config['CACHE_MAX_SIZE'], tag_ttl=app.config['CACHE_TAG_TTL'])
+        self.default_ttl = app.config['CACHE_DEFAULT_TTL']
+        app.extensions['cache'] = self
+
+    def _tag_versions(self, tags):
+        return dict(zip(tags, self.backend.get_counters([f'tag:{tag}' for tag in tags])))
+
+    def get(self, key, default=None):
+        item = self.backend.get(key)
+        if item is not None:
+            _, value, tags = item
+            if not tags or self._tag_versions(list(tags)) == tags:
+                self.hits += 1
+                return value
+        self.misses += 1
+        return default
+
+    def _ttl(self, ttl, tags):
+        ttl = self.default_ttl if ttl is None else ttl
+        if tags:
+            # Teg versiyasi o'chirilgach eski yozuv yana "yangi" bo'lib qolmasligi uchun
+            return min(ttl or self.backend.tag_ttl, self.backend.tag_ttl)
+        return ttl
+
+    def set(self, key, value, ttl=None, tags=()):
+        self.backend.set(key, (value, self._tag_versions(list(tags))), self._ttl(ttl, tags))
+
+    def get_or_set(self, key, factory, ttl=None, tags=()):
+        """Keshdagi qiymat yoki factory() natijasi (keshga yoziladi)"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            # Versiyalar factory'dan oldin olinadi - hisoblash paytidagi invalidatsiya yo'qolmaydi
+            versions = self._tag_versions(list(tags))
+            with self.fill_context():
+                value = factory()
+            self.backend.set(key, (value, versions), self._ttl(ttl, tags))
+        return value
+
+    def delete(self, key):
+        self.backend.delete(key)
+
+    def invalidate_tags(self, *tags):
+        for tag in tags:
+            self.backend.incr(f'tag:{tag}')
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0
+        }
+
+
+cache = Cache()
@@ -0,0 +1,68 @@
+"""
+Topshiriqlar, badge'lar va darajalar katalogi
+
+Katalog ilova ishga tushganda catalog.json faylidan bir marta yuklanadi va
+xotirada indekslanadi: topshiriqlar task_type bo'yicha lug'atdan, badge'lar
+esa ball chegaralari bo'yicha bisect bilan topiladi. `catalog.reload()`
+faylni qayta o'qiydi.
+"""
+
+import json
+import os
+from bisect import bisect_right
+
+CATALOG_PATH = os.environ.get('ECOTRACK_CATALOG') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'catalog.json'
+)
+
+DEFAULT_TASK = {'id': None, 'name': 'Ekologik topshiriq', 'points': 0, 'icon': '🌿',
+                'activity': 'Ekologik topshiriq bajarildi'}
+
+
+class Catalog:
+    def __init__(self, path=CATALOG_PATH):
+        self.path = path
+        self.reload()
+
+    def reload(self):
+        """Katalogni fayldan qayta yuklash va indekslarni qurish"""
+        with open(self.path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        self.level_points = data['level_points']
+        self.tasks = data['tasks']
+        self.tasks_by_type = {f"task_{task['id']}": task for task in self.tasks}
+        self.starter_badge = data['starter_badge']
+        self.badges = sorted(data['badges'], key=lambda badge: badge['points'])
+        self.badge_thresholds = [badge['points'] for badge in self.badges]
+
+    def task(self, task_type):
+        """task_type ('task_3') bo'yicha topshiriq ma'lumoti; noma'lum bo'lsa umumiy yozuv"""
+        return self.tasks_by_type.get(task_type, DEFAULT_TASK)
+
+    def level(self, total_points):
+        return total_points // self.level_points
+
+    def next_level_points(self, total_points):
+        return (self.level(total_points) + 1) * self.level_points - total_points
+
+    def level_progress(self, total_points):
+        """Joriy darajadagi progress foizi"""
+        return (total_points % self.level_points) * 100 // self.level_points
+
+    def reached_badges(self, total_points):
+        """Ball yetgan barcha badge'lar (chegara bo'yicha o'sish tartibida)"""
+        return self.badges[:bisect_right(self.badge_thresholds, total_points)]
+
+    def current_badge(self, total_points):
+        """Eng yuqori yetilgan badge; hali yo'q bo'lsa boshlang'ich badge"""
+        index = bisect_right(self.badge_thresholds, total_points)
+        return self.badges[index - 1] if index else self.starter_badge
+
+    def next_badge(self, total_points):
+        """Keyingi badge; hammasi olingan bo'lsa oxirgisi"""
+        index = bisect_right(self.badge_thresholds, total_points)
+        return self.badges[min(index, len(self.badges) - 1)]
+
+
+catalog = Catalog()
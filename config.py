@@ -1,6 +1,55 @@
 import os
+import multiprocessing
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'eco-track-secret-key-2024'
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///database/eco.db'
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///eco.db'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Ulanishlar puli (PostgreSQL; fayl SQLite ham QueuePool ishlatadi)
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE') or 5),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW') or 10),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE') or 1800),  # s
+        'pool_pre_ping': True
+    }
+    
+    # Og'ir o'qish sahifalari (@read_replica) uchun ixtiyoriy replika
+    SQLALCHEMY_BINDS = {}
+    if os.environ.get('DATABASE_REPLICA_URL'):
+        SQLALCHEMY_BINDS['replica'] = os.environ['DATABASE_REPLICA_URL']
+    
+    # Har bir SQLite ulanishida o'rnatiladigan PRAGMA'lar (None - o'rnatilmaydi).
+    # WAL o'quvchilar yozuvchini kutmasligi uchun, busy_timeout "database is locked" o'rniga kutish uchun
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE') or 'WAL',
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS') or 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT') or 5000),  # ms
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE') or -20000),  # manfiy - KiB
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE') or 256 * 1024 * 1024),
+        'temp_store': 'MEMORY'
+    }
+    
+    # create_app() ro'yxatdan o'tkazadigan blueprint'lar (qolganlari import ham qilinmaydi)
+    BLUEPRINTS = ('blog', 'admin', 'quiz')
+    
+    # Kesh: 'local' (jarayon ichida) yoki 'redis' (umumiy, `pip install redis`)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND') or 'local'
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+    CACHE_DEFAULT_TTL = 300
+    CACHE_MAX_SIZE = 1000
+    CACHE_TAG_TTL = 86400  # teg versiyalari (va teglangan yozuvlar) shuncha soniya saqlanadi
+    
+    # gunicorn (gunicorn.conf.py o'qiydi): 'gthread' yoki 'gevent' (`pip install gevent`)
+    WSGI_BIND = os.environ.get('WSGI_BIND') or '0.0.0.0:8000'
+    WSGI_WORKER_CLASS = os.environ.get('WSGI_WORKER_CLASS') or 'gthread'
+    WSGI_WORKERS = int(os.environ.get('WSGI_WORKERS') or multiprocessing.cpu_count() * 2 + 1)
+    WSGI_THREADS = int(os.environ.get('WSGI_THREADS') or 4)
+    WSGI_WORKER_CONNECTIONS = int(os.environ.get('WSGI_WORKER_CONNECTIONS') or 500)
+    WSGI_TIMEOUT = int(os.environ.get('WSGI_TIMEOUT') or 30)
+    WSGI_MAX_REQUESTS = int(os.environ.get('WSGI_MAX_REQUESTS') or 1000)
+
+class ProductionConfig(Config):
+    DEBUG = False
+    TESTING = False
+    TEMPLATES_AUTO_RELOAD = False
@@ -9,13 +9,13 @@ import os
 # Loyiha papkasini qo'shish
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app import app, db
-from models import User
+from app import create_app
+from models import db, User
 from werkzeug.security import generate_password_hash
 
 def create_admin_user():
     """Admin foydalanuvchi yaratish"""
-    with app.app_context():
+    with create_app().app_context():
         # Admin mavjudligini tekshirish
         admin = User.query.filter_by(email='admin@ecotrack.uz').first()
         if admin:
@@ -0,0 +1,56 @@
+"""
+gunicorn sozlamalari: gunicorn -c gunicorn.conf.py wsgi:app
+
+Ilova master jarayonda bir marta yaratiladi (preload_app), fork qilingan
+worker'lar import qilingan kodni copy-on-write orqali bo'lishadi. Worker
+turi config.Config.WSGI_WORKER_CLASS (muhit: WSGI_WORKER_CLASS) orqali tanlanadi.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+
+WORKER_CLASSES = ('gthread', 'gevent')
+
+if Config.WSGI_WORKER_CLASS not in WORKER_CLASSES:
+    raise RuntimeError(f"WSGI_WORKER_CLASS {WORKER_CLASSES} dan biri bo'lishi kerak")
+
+if Config.WSGI_WORKER_CLASS == 'gevent':
+    try:
+        from gevent import monkey
+    except ImportError:
+        raise RuntimeError("WSGI_WORKER_CLASS='gevent' uchun `pip install gevent` kerak")
+    # Ilova preload qilinishidan oldin - aks holda socket/threading patch'lanmay qoladi
+    monkey.patch_all()
+
+wsgi_app = 'wsgi:app'
+bind = Config.WSGI_BIND
+preload_app = True
+reload = False
+
+worker_class = Config.WSGI_WORKER_CLASS
+workers = Config.WSGI_WORKERS
+threads = Config.WSGI_THREADS
+worker_connections = Config.WSGI_WORKER_CONNECTIONS
+timeout = Config.WSGI_TIMEOUT
+graceful_timeout = Config.WSGI_TIMEOUT
+keepalive = 5
+
+# Xotira sizib chiqmasligi uchun worker'larni vaqti-vaqti bilan yangilash (bir vaqtda emas)
+max_requests = Config.WSGI_MAX_REQUESTS
+max_requests_jitter = Config.WSGI_MAX_REQUESTS // 10
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    """Master'dan meros qolgan ulanishlarni (replika ham) worker'da ishlatmaslik"""
+    from models import db
+    from wsgi import app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -1,5 +1,5 @@
 # Bu fayl paket sifatida tan olinishi uchun
-from app import app
+from app import create_app
 from models import db
 
-__all__ = ['app', 'db']
\ No newline at end of file
+__all__ = ['create_app', 'db']
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Mavjud bazani qayta yaratmasdan model sxemasiga moslashtirish
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+
+def _add_column_sql(table, column, dialect):
+    """ALTER TABLE ... ADD COLUMN ifodasini tuzish"""
+    ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=dialect)}'
+    # Standart qiymat dialekt orqali - masalan false() SQLite'da 0, PostgreSQL'da false
+    default = dialect.ddl_compiler(dialect, None).get_column_default_string(column)
+    if default is not None:
+        ddl += f' DEFAULT {default}'
+    return ddl
+
+
+def _dedupe_sql(table, index):
+    """Unique index qo'shishdan oldin takroriy qatorlarni (eng kichik id qoladi) o'chirish"""
+    columns = ', '.join(column.name for column in index.columns)
+    return (
+        f'DELETE FROM {table.name} WHERE id NOT IN '
+        f'(SELECT MIN(id) FROM {table.name} GROUP BY {columns})'
+    )
+
+
+def upgrade_schema(engine, metadata):
+    """Yetishmayotgan jadval, ustun va indekslarni qo'shish.
+
+    Mavjud ma'lumotlar saqlanadi; bajarilgan o'zgarishlar ro'yxati qaytariladi.
+    """
+    changes = []
+
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+
+        missing_tables = [t for t in metadata.sorted_tables if t.name not in existing_tables]
+        if missing_tables:
+            metadata.create_all(conn, tables=missing_tables)
+            changes.extend(f'table {t.name}' for t in missing_tables)
+
+        for table in metadata.sorted_tables:
+            if table in missing_tables:
+                continue
+
+            existing_columns = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    conn.execute(text(_add_column_sql(table, column, engine.dialect)))
+                    changes.append(f'column {table.name}.{column.name}')
+
+            existing_indexes = {i['name']: bool(i['unique']) for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing_indexes:
+                    if existing_indexes[index.name] == bool(index.unique):
+                        continue
+                    # Indeks unique'ga aylangan (yoki aksincha) - qayta yaratamiz
+                    conn.execute(DropIndex(index))
+                if index.unique and 'id' in table.columns:
+                    conn.execute(text(_dedupe_sql(table, index)))
+                conn.execute(CreateIndex(index))
+                changes.append(f'index {index.name}')
+
+    return changes
@@ -1,20 +1,70 @@
+from flask import g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_login import UserMixin
-from datetime import datetime, date
+from sqlalchemy.sql.expression import SelectBase
+from datetime import datetime
+from functools import wraps
+from contextlib import contextmanager
+import itertools
 import random
 
-db = SQLAlchemy()
+from cache import cache, Cache, LocalBackend
+from catalog import catalog
+from utils import insert_or_ignore, upsert_increment, keyset_paginate
+
+# SQLALCHEMY_BINDS'dagi o'qish replikasi kaliti (sozlanmagan bo'lsa hammasi asosiy bazada)
+REPLICA_BIND = 'replica'
+
+class RoutingSession(Session):
+    """read_replica ko'rinishlaridagi SELECT'lar - replikaga; flush va yozuvlar doim asosiy bazaga"""
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and isinstance(clause, SelectBase)
+            and has_app_context()
+            and g.get('read_replica')
+        ):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def read_replica(view):
+    """Ko'rinishdagi o'qish so'rovlarini replikaga yo'naltiruvchi dekorator"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.read_replica = True
+        return view(*args, **kwargs)
+    return wrapper
+
+@contextmanager
+def primary_reads():
+    """Blok ichidagi o'qishlarni asosiy bazaga qaytarish.
+
+    Keshni to'ldiruvchi factory'lar shu ichida ishlaydi: replika kechikishi bilan
+    o'qilgan qiymat yangi teg versiyalari bilan keshga "joriy" bo'lib yozilmasin.
+    """
+    if not has_app_context() or not g.get('read_replica'):
+        yield
+        return
+    g.read_replica = False
+    try:
+        yield
+    finally:
+        g.read_replica = True
+
+# Yagona SQLAlchemy obyekti - barcha modellar shu yerda bir marta ro'yxatdan o'tadi
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
     password_hash = db.Column(db.String(200), nullable=False)
-    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
-    
-    # Relationshiplar
-    points = db.relationship('EcoPoint', backref='user', lazy='dynamic')
-    badges = db.relationship('Badge', backref='user', lazy='dynamic')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    is_admin = db.Column(db.Boolean, default=False)
     
     def __repr__(self):
         return f'<User {self.name}>'
@@ -22,87 +72,763 @@ class User(UserMixin, db.Model):
 class EcoPoint(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    date = db.Column(db.Date, default=db.func.current_date())
+    date = db.Column(db.Date, default=datetime.utcnow, index=True)
     points = db.Column(db.Integer, default=0)
     task_type = db.Column(db.String(50), nullable=False)
     description = db.Column(db.String(200))
+    __table_args__ = (
+        db.Index('ix_eco_point_user_date_task', 'user_id', 'date', 'task_type', unique=True),
+    )
     
     @staticmethod
     def get_user_total_points(user_id):
+        stats = db.session.get(UserStats, user_id)
+        if stats:
+            return stats.total_points
         result = db.session.query(db.func.sum(EcoPoint.points)).filter(
             EcoPoint.user_id == user_id
         ).scalar()
         return result if result else 0
-    
+
+    def __repr__(self):
+        return f'<EcoPoint {self.points} - {self.date}>'
+
+class UserStats(db.Model):
+    """Foydalanuvchi ballari bo'yicha yig'ma jadval (EcoPoint tarixidan tiklanadi)"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    total_points = db.Column(db.Integer, default=0, nullable=False)
+    task_count = db.Column(db.Integer, default=0, nullable=False)
+    active_days = db.Column(db.Integer, default=0, nullable=False)
+    last_activity_date = db.Column(db.Date)
+
+    @staticmethod
+    def history_query():
+        """EcoPoint tarixidan yig'ma qiymatlarni hisoblovchi so'rov"""
+        return db.select(
+            EcoPoint.user_id,
+            db.func.coalesce(db.func.sum(EcoPoint.points), 0),
+            db.func.count(EcoPoint.id),
+            db.func.count(db.distinct(EcoPoint.date)),
+            db.func.max(EcoPoint.date)
+        ).group_by(EcoPoint.user_id)
+
+    @staticmethod
+    def record_task(user_id, points, activity_date):
+        """Yangi topshiriqni yig'ma jadvalga qo'shish va yangi umumiy ballni qaytarish
+        (commit chaqiruvchi tomonidan)"""
+        return UserStats._apply(user_id, db.update(UserStats).values(
+            total_points=UserStats.total_points + points,
+            task_count=UserStats.task_count + 1,
+            active_days=db.case(
+                (UserStats.last_activity_date == activity_date, UserStats.active_days),
+                else_=UserStats.active_days + 1
+            ),
+            last_activity_date=activity_date
+        ))
+
+    @staticmethod
+    def record_batch(user_id, points, task_count, new_active_days, last_date):
+        """Bir nechta topshiriqni bitta UPDATE bilan qo'shish va yangi umumiy ballni qaytarish.
+
+        new_active_days - foydalanuvchi avval faol bo'lmagan kunlar soni.
+        Commit chaqiruvchi tomonidan.
+        """
+        return UserStats._apply(user_id, db.update(UserStats).values(
+            total_points=UserStats.total_points + points,
+            task_count=UserStats.task_count + task_count,
+            active_days=UserStats.active_days + new_active_days,
+            last_activity_date=db.case(
+                (UserStats.last_activity_date >= last_date, UserStats.last_activity_date),
+                else_=last_date
+            )
+        ))
+
     @staticmethod
-    def get_user_points_by_date(user_id, start_date, end_date):
-        return db.session.query(db.func.sum(EcoPoint.points)).filter(
-            EcoPoint.user_id == user_id,
-            EcoPoint.date >= start_date,
-            EcoPoint.date <= end_date
+    def _apply(user_id, update):
+        """UPDATE'ni bajarib yangi umumiy ballni qaytarish.
+
+        Qator ro'yxatdan o'tishda yaratiladi; undan oldingi foydalanuvchilar uchun u
+        tarixdan (yangi yozuvlar bilan birga) DELETE'siz INSERT ... SELECT ON CONFLICT
+        DO NOTHING bilan yaratiladi. Parallel so'rov qatorni oldinroq yaratgan bo'lsa,
+        INSERT hech narsa qilmaydi va UPDATE qayta bajariladi.
+        """
+        update = update.where(UserStats.user_id == user_id).returning(UserStats.total_points)
+        total_points = db.session.execute(update).scalar()
+        if total_points is not None:
+            return total_points
+
+        db.session.flush()
+        created = db.session.execute(
+            insert_or_ignore(db.session, UserStats).from_select(
+                ['user_id', 'total_points', 'task_count', 'active_days', 'last_activity_date'],
+                UserStats.history_query().where(EcoPoint.user_id == user_id)
+            )
+        ).rowcount
+        if not created:
+            return db.session.execute(update).scalar() or 0
+        return db.session.execute(
+            db.select(UserStats.total_points).where(UserStats.user_id == user_id)
         ).scalar() or 0
-    
+
+    @staticmethod
+    def rebuild(user_id=None):
+        """Yig'ma jadvalni EcoPoint tarixidan qayta qurish (commit chaqiruvchi tomonidan)"""
+        query = UserStats.history_query()
+        delete = db.delete(UserStats)
+        if user_id is not None:
+            query = query.where(EcoPoint.user_id == user_id)
+            delete = delete.where(UserStats.user_id == user_id)
+
+        db.session.execute(delete)
+        db.session.execute(
+            db.insert(UserStats).from_select(
+                ['user_id', 'total_points', 'task_count', 'active_days', 'last_activity_date'],
+                query
+            )
+        )
+
     def __repr__(self):
-        return f'<EcoPoint {self.points} - {self.date}>'
+        return f'<UserStats user:{self.user_id} points:{self.total_points}>'
 
 class Badge(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     badge_name = db.Column(db.String(100), nullable=False)
     badge_description = db.Column(db.String(200))
-    earned_date = db.Column(db.Date, default=db.func.current_date())
+    earned_date = db.Column(db.Date, default=datetime.utcnow)
     badge_icon = db.Column(db.String(50), default='🛡️')
+    __table_args__ = (
+        db.Index('ix_badge_user_name', 'user_id', 'badge_name', unique=True),
+    )
     
     @staticmethod
     def assign_badge(user_id, total_points):
-        badges = {
-            50: {"name": "Green Starter", "description": "Yashil yo'l boshlovchisi", "icon": "🌱"},
-            100: {"name": "Eco Friend", "description": "Tabiat do'sti", "icon": "🤝"},
-            200: {"name": "Nature Guardian", "description": "Tabiat himoyachisi", "icon": "🛡️"},
-            500: {"name": "Planet Hero", "description": "Sayyora qahramoni", "icon": "🦸"},
-            1000: {"name": "Eco Master", "description": "Ekologiya ustasi", "icon": "🏆"}
-        }
+        """Yetgan, lekin hali berilmagan badge'larni berish (commit chaqiruvchi tomonidan).
+
+        Mavjud badge nomlari bitta so'rov bilan olinadi, yangilari bitta bulk
+        INSERT bilan qo'shiladi. Yangi berilgan badge nomlari ro'yxati qaytariladi.
+        """
+        reached = catalog.reached_badges(total_points)
+        if not reached:
+            return []
         
-        earned_badge = None
+        existing = set(db.session.execute(
+            db.select(Badge.badge_name).where(Badge.user_id == user_id)
+        ).scalars())
         
-        for points, badge_info in badges.items():
-            if total_points >= points:
-                # Badge allaqachon berilganligini tekshirish
-                existing_badge = Badge.query.filter_by(
-                    user_id=user_id, 
-                    badge_name=badge_info["name"]
-                ).first()
-                
-                if not existing_badge:
-                    new_badge = Badge(
-                        user_id=user_id,
-                        badge_name=badge_info["name"],
-                        badge_description=badge_info["description"],
-                        badge_icon=badge_info["icon"]
-                    )
-                    db.session.add(new_badge)
-                    db.session.commit()
-                    earned_badge = badge_info["name"]
+        new_badges = [
+            {
+                'user_id': user_id,
+                'badge_name': info['name'],
+                'badge_description': info['description'],
+                'badge_icon': info['icon'],
+                'earned_date': datetime.now().date()
+            }
+            for info in reached if info['name'] not in existing
+        ]
+        if new_badges:
+            db.session.execute(insert_or_ignore(db.session, Badge), new_badges)
         
-        return earned_badge
+        return [badge['badge_name'] for badge in new_badges]
     
-    def __repr__(self):
-        return f'<Badge {self.badge_name}>'
+    @staticmethod
+    def for_user(user_id):
+        """Foydalanuvchi badge'lari (yangisi birinchi) - f'user:{id}' tegi bilan keshlanadi"""
+        def load():
+            badges = Badge.query.filter_by(user_id=user_id).order_by(Badge.earned_date.desc(), Badge.id.desc()).all()
+            return [
+                {
+                    'badge_name': badge.badge_name,
+                    'badge_description': badge.badge_description,
+                    'badge_icon': badge.badge_icon,
+                    'earned_date': badge.earned_date
+                }
+                for badge in badges
+            ]
+        return cache.get_or_set(f'badges:{user_id}', load, tags=(f'user:{user_id}',))
+    
+    @staticmethod
+    def backfill():
+        """Barcha foydalanuvchilarga UserStats bo'yicha yetgan badge'larni berish.
+
+        Har bir chegara uchun bitta INSERT ... SELECT; foydalanuvchilar soniga bog'liq emas.
+        """
+        inserted = 0
+        for info in catalog.badges:
+            eligible = db.select(
+                UserStats.user_id,
+                db.literal(info['name']),
+                db.literal(info['description']),
+                db.literal(info['icon']),
+                db.literal(datetime.now().date())
+            ).where(
+                UserStats.total_points >= info['points'],
+                ~db.exists().where(Badge.user_id == UserStats.user_id, Badge.badge_name == info['name'])
+            )
+            inserted += db.session.execute(
+                insert_or_ignore(db.session, Badge).from_select(
+                    ['user_id', 'badge_name', 'badge_description', 'badge_icon', 'earned_date'],
+                    eligible
+                )
+            ).rowcount
+        return inserted
+
+# Maslahatlar keshi ('tips' tegi bilan) - CACHE_BACKEND'dan qat'i nazar jarayon xotirasida
+TIP_CACHE_TTL = 300
+TIP_CACHE_MAX_SIZE = 5000
+_tip_cache = Cache(LocalBackend(max_size=1), default_ttl=TIP_CACHE_TTL, fill_context=primary_reads)
 
 class Tip(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     text = db.Column(db.Text, nullable=False)
     category = db.Column(db.String(50), nullable=False)
-    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     @staticmethod
     def get_random_tip():
-        tips = Tip.query.all()
-        return random.choice(tips).text if tips else "Tabiatni seving! 🌍"
+        """Tasodifiy maslahat - odatda bazaga murojaat qilmasdan, keshdan"""
+        tips = _tip_cache.get_or_set('tips', Tip._load_tips, tags=('tips',))
+        if tips['texts'] is not None:
+            return random.choice(tips['texts']) if tips['texts'] else "Tabiatni seving! 🌍"
+        
+        # Maslahatlar keshga sig'maydi: id oralig'idan tasodifiy tanlash (PK bo'yicha qidiruv)
+        random_id = random.randint(tips['min_id'], tips['max_id'])
+        text = db.session.query(Tip.text).filter(Tip.id >= random_id).order_by(Tip.id).limit(1).scalar()
+        return text or "Tabiatni seving! 🌍"
+    
+    @staticmethod
+    def _load_tips():
+        min_id, max_id, count = db.session.query(
+            db.func.min(Tip.id), db.func.max(Tip.id), db.func.count(Tip.id)
+        ).one()
+        texts = None
+        if count <= TIP_CACHE_MAX_SIZE:
+            texts = [text for (text,) in db.session.query(Tip.text).all()]
+        
+        return {'texts': texts, 'min_id': min_id or 0, 'max_id': max_id or 0}
+    
+    @staticmethod
+    def invalidate_cache():
+        _tip_cache.invalidate_tags('tips')
+
+@db.event.listens_for(Tip, 'after_insert')
+@db.event.listens_for(Tip, 'after_update')
+@db.event.listens_for(Tip, 'after_delete')
+def _invalidate_tip_cache(mapper, connection, target):
+    Tip.invalidate_cache()
+
+# Blog Modellari
+class BlogPost(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    is_published = db.Column(db.Boolean, default=True)
+    like_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    __table_args__ = (
+        db.Index('ix_blog_post_published_created', 'is_published', 'created_at'),
+    )
+    
+    # Relationships
+    author = db.relationship('User', backref='posts')
+    likes = db.relationship('PostLike', backref='post', lazy=True, cascade='all, delete-orphan')
+    comments = db.relationship('PostComment', backref='post', lazy=True, cascade='all, delete-orphan')
+    
+    @staticmethod
+    def attach_counts(posts):
+        """Postlarga tasdiqlangan izohlar sonini (comments_count) bitta guruhlangan so'rov bilan biriktirish
+
+        Like soni BlogPost.like_count ustunida saqlanadi.
+        """
+        post_ids = [post.id for post in posts]
+        if not post_ids:
+            return posts
+        
+        rows = db.session.execute(
+            db.select(PostComment.post_id, db.func.count(PostComment.id))
+            .where(PostComment.post_id.in_(post_ids), PostComment.is_approved == True)
+            .group_by(PostComment.post_id)
+        )
+        counts = dict(rows.all())
+        
+        for post in posts:
+            post.comments_count = counts.get(post.id, 0)
+        return posts
+    
+    @staticmethod
+    def rebuild_like_counts():
+        """like_count ustunini PostLike jadvalidan qayta hisoblash (commit chaqiruvchi tomonidan)"""
+        db.session.execute(
+            db.update(BlogPost).values(
+                like_count=db.select(db.func.count(PostLike.id))
+                .where(PostLike.post_id == BlogPost.id)
+                .scalar_subquery(),
+                updated_at=BlogPost.updated_at
+            )
+        )
+    
+    def __repr__(self):
+        return f'<BlogPost {self.title}>'
+
+class PostLike(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    post_id = db.Column(db.Integer, db.ForeignKey('blog_post.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        db.Index('ix_post_like_user_post', 'user_id', 'post_id', unique=True),
+        db.Index('ix_post_like_post', 'post_id'),
+    )
+    
+    @staticmethod
+    def toggle(user_id, post_id):
+        """Like qo'yish yoki olib tashlash.
+
+        Like qatori va BlogPost.like_count bitta tranzaksiyada atomar o'zgaradi
+        (commit chaqiruvchi tomonidan). (liked, like_count) qaytaradi, post
+        topilmasa None.
+        """
+        removed = db.session.execute(
+            db.delete(PostLike).where(PostLike.user_id == user_id, PostLike.post_id == post_id)
+        ).rowcount
+        
+        if removed:
+            liked, delta = False, -removed
+        else:
+            # Ikki marta bosilganda unique index takroriy qatorni jimgina tashlab yuboradi
+            inserted = db.session.execute(
+                insert_or_ignore(db.session, PostLike).values(
+                    user_id=user_id, post_id=post_id, created_at=datetime.utcnow()
+                )
+            ).rowcount
+            liked, delta = True, inserted
+        
+        like_count = db.session.execute(
+            db.update(BlogPost)
+            .where(BlogPost.id == post_id)
+            .values(like_count=BlogPost.like_count + delta, updated_at=BlogPost.updated_at)
+            .returning(BlogPost.like_count)
+        ).scalar()
+        
+        return None if like_count is None else (liked, like_count)
+    
+    def __repr__(self):
+        return f'<PostLike user:{self.user_id} post:{self.post_id}>'
+
+class PostComment(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    content = db.Column(db.Text, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    post_id = db.Column(db.Integer, db.ForeignKey('blog_post.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    is_approved = db.Column(db.Boolean, default=True)
+    # Moderator rad etgan izoh (is_approved=False bilan birga); rad etilmagan tasdiqlanmagan - kutilmoqda
+    is_rejected = db.Column(db.Boolean, default=False, server_default=db.false(), nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_post_comment_moderation_created', 'is_approved', 'is_rejected', 'created_at'),
+        db.Index('ix_post_comment_post_approved_created', 'post_id', 'is_approved', 'created_at'),
+    )
+    
+    MODERATION_ACTIONS = ('approve', 'reject', 'delete')
+    
+    # Relationships
+    user = db.relationship('User', backref='comments')
+    
+    @staticmethod
+    def approved_page(post_id, after=None, per_page=20):
+        """Postning tasdiqlangan izohlari: yangidan eskiga kursorli sahifa, muallif bilan birga"""
+        return keyset_paginate(
+            PostComment.query
+            .filter_by(post_id=post_id, is_approved=True)
+            .options(db.joinedload(PostComment.user)),
+            PostComment.created_at, PostComment.id,
+            after=after,
+            per_page=per_page
+        )
+    
+    @staticmethod
+    def moderation_filter(status):
+        """Moderatsiya holati (pending/approved/rejected) uchun WHERE shartlari; 'all' - shartsiz"""
+        return {
+            'pending': (PostComment.is_approved == False, PostComment.is_rejected == False),
+            # Tasdiqlash is_rejected'ni tozalaydi - har bir holat indeksning to'liq prefiksiga mos
+            'approved': (PostComment.is_approved == True, PostComment.is_rejected == False),
+            'rejected': (PostComment.is_approved == False, PostComment.is_rejected == True),
+            'all': ()
+        }[status]
     
     @staticmethod
-    def get_tips_by_category(category):
-        return Tip.query.filter_by(category=category).all()
+    def moderate(comment_ids, action):
+        """Izohlarni bitta UPDATE/DELETE bilan tasdiqlash, rad etish yoki o'chirish
+        (commit chaqiruvchi tomonidan). Ta'sirlangan qatorlar sonini qaytaradi."""
+        selected = PostComment.id.in_(comment_ids)
+        if action == 'delete':
+            rows = db.session.execute(
+                db.delete(PostComment).where(selected)
+                .returning(PostComment.post_id, PostComment.user_id, PostComment.created_at)
+            ).all()
+            # Ommaviy DELETE after_delete hodisasini chaqirmaydi - daily_rollup shu yerda kamaytiriladi
+            DailyRollup.record([
+                (created.date() if created else None, user_id, None, {'comments': -1})
+                for _, user_id, created in rows
+            ])
+            return len(rows)
+        
+        return db.session.execute(
+            db.update(PostComment).where(selected)
+            .values(is_approved=action == 'approve', is_rejected=action == 'reject')
+        ).rowcount
+    
+    def __repr__(self):
+        return f'<PostComment {self.content[:50]}...>'
+
+class DailyRollup(db.Model):
+    """Kunlik yig'ma statistika.
+
+    user_id=0 - barcha foydalanuvchilar, task_type='' - barcha topshiriq turlari.
+    Yozuvlarda oshiriladi, `flask rebuild-rollup` bilan xom jadvallardan tiklanadi.
+    """
+    __tablename__ = 'daily_rollup'
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    day = db.Column(db.Date, primary_key=True)
+    task_type = db.Column(db.String(50), primary_key=True)
+    points = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    task_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    new_users = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    posts = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    comments = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+
+    COUNTERS = ('points', 'task_count', 'new_users', 'posts', 'comments')
+
+    @staticmethod
+    def record(events, connection=None):
+        """Hodisalarni qo'shish: events - (day, user_id, task_type, {counter: qiymat}).
+
+        Har bir hodisa umumiy va foydalanuvchi/topshiriq kesimidagi qatorlarga
+        tarqatiladi; barcha qatorlar bitta executemany upsert bilan yoziladi.
+        """
+        totals = {}
+        for day, user_id, task_type, counters in events:
+            if day is None:
+                continue
+            for key in itertools.product((0, user_id) if user_id else (0,),
+                                         ('', task_type) if task_type else ('',)):
+                row = totals.setdefault((key[0], day, key[1]), dict.fromkeys(DailyRollup.COUNTERS, 0))
+                for name, value in counters.items():
+                    row[name] += value
+
+        rows = [
+            {'user_id': user_id, 'day': day, 'task_type': task_type, **counters}
+            for (user_id, day, task_type), counters in totals.items()
+        ]
+        if rows:
+            bind = connection if connection is not None else db.session
+            stmt = upsert_increment(bind, DailyRollup, ['user_id', 'day', 'task_type'], DailyRollup.COUNTERS)
+            bind.execute(stmt, rows)
+        return len(rows)
+
+    @staticmethod
+    def totals(user_id=0, since=None):
+        """Kunlik qatorlar yig'indisi (since - shu kundan boshlab)"""
+        query = db.select(*[
+            db.func.coalesce(db.func.sum(getattr(DailyRollup, name)), 0).label(name)
+            for name in DailyRollup.COUNTERS
+        ]).where(DailyRollup.user_id == user_id, DailyRollup.task_type == '')
+        if since is not None:
+            query = query.where(DailyRollup.day >= since)
+        return db.session.execute(query).one()
+
+    @staticmethod
+    def rebuild():
+        """Jadvalni EcoPoint, User, BlogPost va PostComment'dan qayta qurish (commit chaqiruvchi tomonidan)"""
+        def day(column):
+            return db.func.date(column, type_=db.Date)
+
+        events = [
+            (activity_date, user_id, task_type, {'points': points, 'task_count': count})
+            for activity_date, user_id, task_type, points, count in db.session.execute(
+                db.select(EcoPoint.date, EcoPoint.user_id, EcoPoint.task_type,
+                          db.func.coalesce(db.func.sum(EcoPoint.points), 0), db.func.count(EcoPoint.id))
+                .group_by(EcoPoint.date, EcoPoint.user_id, EcoPoint.task_type)
+            )
+        ]
+        events += [
+            (created, None, None, {'new_users': count})
+            for created, count in db.session.execute(
+                db.select(day(User.created_at), db.func.count(User.id)).group_by(day(User.created_at))
+            )
+        ]
+        for model, user_column, counter in ((BlogPost, BlogPost.author_id, 'posts'),
+                                            (PostComment, PostComment.user_id, 'comments')):
+            events += [
+                (created, user_id, None, {counter: count})
+                for created, user_id, count in db.session.execute(
+                    db.select(day(model.created_at), user_column, db.func.count(model.id))
+                    .group_by(day(model.created_at), user_column)
+                )
+            ]
+
+        db.session.execute(db.delete(DailyRollup))
+        return DailyRollup.record(events)
+
+    def __repr__(self):
+        return f'<DailyRollup {self.day} user:{self.user_id} {self.task_type or "*"}>'
+
+def _track_in_rollup(model, counter, user_attr=None):
+    """Model qo'shilganda/o'chirilganda daily_rollup hisoblagichini o'zgartirish"""
+    def record(connection, target, delta):
+        created = target.created_at or datetime.utcnow()
+        user_id = getattr(target, user_attr) if user_attr else None
+        DailyRollup.record([(created.date(), user_id, None, {counter: delta})], connection)
+
+    db.event.listen(model, 'after_insert', lambda mapper, connection, target: record(connection, target, 1))
+    db.event.listen(model, 'after_delete', lambda mapper, connection, target: record(connection, target, -1))
+
+_track_in_rollup(User, 'new_users')
+_track_in_rollup(BlogPost, 'posts', 'author_id')
+_track_in_rollup(PostComment, 'comments', 'user_id')
+
+# Quiz Modellari
+# Kompilyatsiya qilingan javoblar kaliti keshi (kalit quiz versiyasini o'z ichiga oladi)
+QUIZ_KEY_TTL = 3600
+
+class Quiz(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    is_active = db.Column(db.Boolean, default=True)
+    # Savollar o'zgarganda oshiriladi - javoblar kaliti keshi shu bo'yicha yangilanadi
+    version = db.Column(db.Integer, default=1, server_default='1', nullable=False)
+    
+    # Relationships
+    questions = db.relationship('QuizQuestion', backref='quiz', lazy=True, cascade='all, delete-orphan',
+                                order_by='QuizQuestion.id')
+    
+    @staticmethod
+    def load_with_questions(quiz_id):
+        """Quiz va uning savollari bitta JOIN so'rovida"""
+        return Quiz.query.options(db.joinedload(Quiz.questions)).filter(Quiz.id == quiz_id).first()
+    
+    @staticmethod
+    def bump_version(quiz_id):
+        """Savollar o'zgargani haqida belgi (commit chaqiruvchi tomonidan)"""
+        db.session.execute(db.update(Quiz).where(Quiz.id == quiz_id).values(version=Quiz.version + 1))
+    
+    @staticmethod
+    def answer_key(quiz_id, version):
+        """Javoblar kaliti: ((question_id, to'g'ri harf, ball), ...) id tartibida, versiya bo'yicha keshlanadi"""
+        def compile_key():
+            rows = db.session.execute(
+                db.select(QuizQuestion.id, QuizQuestion.correct_answer, QuizQuestion.points)
+                .where(QuizQuestion.quiz_id == quiz_id)
+                .order_by(QuizQuestion.id)
+            )
+            return tuple(
+                (question_id, (correct or '').strip().upper(), points or 0)
+                for question_id, correct, points in rows
+            )
+        
+        return cache.get_or_set(f'quiz_key:{quiz_id}:{version}', compile_key, ttl=QUIZ_KEY_TTL)
+    
+    @staticmethod
+    def grade(key, answers):
+        """Javoblarni bir o'tishda baholash: (ball, to'g'ri javoblar bitmaskasi).
+        answers - {question_id: 'A'}; i-bit kalitdagi i-savolga mos keladi."""
+        score = 0
+        mask = 0
+        for index, (question_id, correct, points) in enumerate(key):
+            if correct and answers.get(question_id) == correct:
+                score += points
+                mask |= 1 << index
+        return score, mask
+    
+    def __repr__(self):
+        return f'<Quiz {self.title}>'
+
+class QuizQuestion(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    question_text = db.Column(db.Text, nullable=False)
+    option_a = db.Column(db.String(200))
+    option_b = db.Column(db.String(200))
+    option_c = db.Column(db.String(200))
+    option_d = db.Column(db.String(200))
+    correct_answer = db.Column(db.String(1))  # 'A', 'B', 'C', 'D'
+    points = db.Column(db.Integer, default=1)
+    
+    def __repr__(self):
+        return f'<QuizQuestion {self.question_text[:50]}...>'
+
+class QuizAttempt(db.Model):
+    """Foydalanuvchining bitta quiz urinishi (server tomonida baholangan)"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    quiz_version = db.Column(db.Integer, nullable=False)
+    score = db.Column(db.Integer, nullable=False)
+    max_score = db.Column(db.Integer, nullable=False)
+    # i-bit - javoblar kalitidagi i-savolga to'g'ri javob berilgan (little-endian baytlar)
+    correct_mask = db.Column(db.LargeBinary, nullable=False)
+    question_count = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        db.Index('ix_quiz_attempt_user_quiz', 'user_id', 'quiz_id'),
+        db.Index('ix_quiz_attempt_quiz_created', 'quiz_id', 'created_at'),
+    )
+    
+    @staticmethod
+    def pack_mask(mask, question_count):
+        return mask.to_bytes((question_count + 7) // 8, 'little')
+    
+    @staticmethod
+    def unpack_mask(raw):
+        return int.from_bytes(raw, 'little')
+    
+    def __repr__(self):
+        return f'<QuizAttempt quiz:{self.quiz_id} user:{self.user_id} {self.score}/{self.max_score}>'
+
+# Har bir quiz uchun saqlanadigan reyting o'rinlari
+QUIZ_LEADERBOARD_SIZE = 10
+
+class QuizStats(db.Model):
+    """Quiz bo'yicha yig'ma hisoblagichlar (har bir baholangan urinishda oshiriladi)"""
+    __tablename__ = 'quiz_stats'
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), primary_key=True, autoincrement=False)
+    attempts = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    total_score = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    total_max_score = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    
+    COUNTERS = ('attempts', 'total_score', 'total_max_score')
+    
+    @property
+    def average_score(self):
+        return round(self.total_score / self.attempts, 1) if self.attempts else 0
+    
+    @property
+    def average_percent(self):
+        return round(self.total_score * 100 / self.total_max_score) if self.total_max_score else 0
+    
+    @staticmethod
+    def record_attempt(quiz_id, user_id, score, max_score, key, mask, achieved_at=None):
+        """Urinishni quiz, savol va reyting hisoblagichlariga qo'shish (commit chaqiruvchi tomonidan)"""
+        # Avval quiz qatori: upsert shu quiz bo'yicha parallel urinishlarni navbatga qo'yadi
+        # (SQLite - yozish qulfi, Postgres - qator qulfi), reyting quyida izchil o'qiladi
+        db.session.execute(
+            upsert_increment(db.session, QuizStats, ['quiz_id'], QuizStats.COUNTERS),
+            [{'quiz_id': quiz_id, 'attempts': 1, 'total_score': score, 'total_max_score': max_score}]
+        )
+        db.session.execute(
+            upsert_increment(db.session, QuizQuestionStats, ['question_id'], QuizQuestionStats.COUNTERS),
+            [
+                {'question_id': question_id, 'quiz_id': quiz_id, 'attempts': 1, 'correct': mask >> index & 1}
+                for index, (question_id, _, _) in enumerate(key)
+            ]
+        )
+        QuizLeaderboard.submit(quiz_id, user_id, score, max_score, achieved_at)
+    
+    @staticmethod
+    def rebuild(quiz_id=None):
+        """Hisoblagichlar va reytingni quiz_attempt jadvalidan qayta qurish (commit chaqiruvchi tomonidan).
+
+        Bitmaska bitlari savollarga id tartibida mos keladi (savollar faqat qo'shiladi).
+        """
+        tables = (QuizStats, QuizQuestionStats, QuizLeaderboard)
+        attempts = db.select(QuizAttempt).order_by(QuizAttempt.id)
+        if quiz_id is not None:
+            attempts = attempts.where(QuizAttempt.quiz_id == quiz_id)
+        for model in tables:
+            delete = db.delete(model)
+            if quiz_id is not None:
+                delete = delete.where(model.quiz_id == quiz_id)
+            db.session.execute(delete)
+        
+        question_ids = {}
+        for attempt in db.session.scalars(attempts, execution_options={'yield_per': 1000}):
+            if attempt.quiz_id not in question_ids:
+                question_ids[attempt.quiz_id] = db.session.scalars(
+                    db.select(QuizQuestion.id).where(QuizQuestion.quiz_id == attempt.quiz_id).order_by(QuizQuestion.id)
+                ).all()
+            question_count = attempt.question_count or len(attempt.correct_mask) * 8
+            key = [(question_id, None, None) for question_id in question_ids[attempt.quiz_id][:question_count]]
+            QuizStats.record_attempt(attempt.quiz_id, attempt.user_id, attempt.score, attempt.max_score,
+                                     key, QuizAttempt.unpack_mask(attempt.correct_mask), attempt.created_at)
+    
+    def __repr__(self):
+        return f'<QuizStats quiz:{self.quiz_id} attempts:{self.attempts}>'
+
+class QuizQuestionStats(db.Model):
+    """Savol bo'yicha javoblar va to'g'ri javoblar soni"""
+    __tablename__ = 'quiz_question_stats'
+    question_id = db.Column(db.Integer, db.ForeignKey('quiz_question.id'), primary_key=True, autoincrement=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False, index=True)
+    attempts = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    correct = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    
+    COUNTERS = ('attempts', 'correct')
+    
+    @property
+    def correct_rate(self):
+        return round(self.correct * 100 / self.attempts) if self.attempts else 0
+    
+    def __repr__(self):
+        return f'<QuizQuestionStats question:{self.question_id} {self.correct}/{self.attempts}>'
+
+class QuizLeaderboard(db.Model):
+    """Quizning eng yaxshi QUIZ_LEADERBOARD_SIZE natijasi (har bir foydalanuvchining eng yaxshisi)"""
+    __tablename__ = 'quiz_leaderboard'
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True, autoincrement=False)
+    best_score = db.Column(db.Integer, nullable=False)
+    max_score = db.Column(db.Integer, nullable=False)
+    achieved_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    user = db.relationship('User')
+    
+    @staticmethod
+    def top(quiz_id):
+        """Reyting: ball kamayishi, teng bo'lsa avval erishgan yuqorida"""
+        return QuizLeaderboard.query.filter_by(quiz_id=quiz_id).order_by(
+            QuizLeaderboard.best_score.desc(), QuizLeaderboard.achieved_at, QuizLeaderboard.user_id
+        )
+    
+    @staticmethod
+    def submit(quiz_id, user_id, score, max_score, achieved_at=None):
+        """Natija reytingga kirsa yozish va QUIZ_LEADERBOARD_SIZE dan oshganini olib tashlash.
+
+        Reytingdan tushgan foydalanuvchining eng yaxshi natijasi oxirgi o'rindan past bo'ladi,
+        shuning uchun faqat top-N saqlash yetarli. Commit chaqiruvchi tomonidan.
+        """
+        achieved_at = achieved_at or datetime.utcnow()
+        board = db.session.execute(
+            db.select(QuizLeaderboard.user_id, QuizLeaderboard.best_score)
+            .where(QuizLeaderboard.quiz_id == quiz_id)
+            .order_by(QuizLeaderboard.best_score.desc(), QuizLeaderboard.achieved_at, QuizLeaderboard.user_id)
+        ).all()
+        
+        current = dict(board)
+        if user_id in current:
+            if score > current[user_id]:
+                db.session.execute(
+                    db.update(QuizLeaderboard)
+                    .where(QuizLeaderboard.quiz_id == quiz_id, QuizLeaderboard.user_id == user_id)
+                    .values(best_score=score, max_score=max_score, achieved_at=achieved_at)
+                )
+            return
+        
+        if len(board) >= QUIZ_LEADERBOARD_SIZE and score <= board[QUIZ_LEADERBOARD_SIZE - 1][1]:
+            return
+        db.session.execute(db.insert(QuizLeaderboard).values(
+            quiz_id=quiz_id, user_id=user_id, best_score=score, max_score=max_score, achieved_at=achieved_at
+        ))
+        dropped = [row_user_id for row_user_id, _ in board[QUIZ_LEADERBOARD_SIZE - 1:]]
+        if dropped:
+            db.session.execute(db.delete(QuizLeaderboard).where(
+                QuizLeaderboard.quiz_id == quiz_id, QuizLeaderboard.user_id.in_(dropped)
+            ))
     
     def __repr__(self):
-        return f'<Tip {self.text[:50]}...>'
\ No newline at end of file
+        return f'<QuizLeaderboard quiz:{self.quiz_id} user:{self.user_id} {self.best_score}>'
@@ -0,0 +1,394 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask_login import login_required, current_user
+from datetime import datetime
+import csv
+import io
+import json
+
+from cache import cache
+from catalog import catalog
+from models import (db, Quiz, QuizQuestion, QuizAttempt, QuizStats, QuizQuestionStats, QuizLeaderboard,
+                    EcoPoint, UserStats, DailyRollup, Badge)
+from utils import keyset_paginate, approximate_count, insert_or_ignore, ADMIN_PAGE_SIZE
+
+quiz_bp = Blueprint('quiz', __name__)
+
+# Savollar importi: bitta fayldagi qatorlar chegarasi va ustunlar
+QUIZ_IMPORT_MAX_ROWS = 5000
+QUIZ_IMPORT_FIELDS = ('question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_answer', 'points')
+
+# Reyting javobi keshi (teg boshqa worker'larda bekor qilinmasligi mumkin - qisqa TTL)
+QUIZ_LEADERBOARD_TTL = 30
+
+# ===== QUIZ API (foydalanuvchilar uchun) =====
+@quiz_bp.route('/api/quizzes/<int:quiz_id>')
+@login_required
+def quiz_detail(quiz_id):
+    """Quiz savollari (to'g'ri javoblarsiz)"""
+    quiz = Quiz.load_with_questions(quiz_id)
+    if not quiz or not quiz.is_active:
+        return jsonify({'success': False, 'message': 'Quiz topilmadi'}), 404
+    
+    return jsonify({
+        'id': quiz.id,
+        'title': quiz.title,
+        'description': quiz.description,
+        'version': quiz.version,
+        'questions': [{
+            'id': question.id,
+            'text': question.question_text,
+            'options': {
+                letter: option for letter, option in (
+                    ('A', question.option_a), ('B', question.option_b),
+                    ('C', question.option_c), ('D', question.option_d)
+                ) if option
+            },
+            'points': question.points
+        } for question in quiz.questions]
+    })
+
+@quiz_bp.route('/api/quizzes/<int:quiz_id>/leaderboard')
+@login_required
+def quiz_leaderboard(quiz_id):
+    """Quiz reytingi va o'rtacha natija"""
+    def load():
+        stats = db.session.get(QuizStats, quiz_id)
+        return {
+            'attempts': stats.attempts if stats else 0,
+            'average_score': stats.average_score if stats else 0,
+            'average_percent': stats.average_percent if stats else 0,
+            'leaderboard': [{
+                'rank': rank,
+                'user': entry.user.name,
+                'score': entry.best_score,
+                'max_score': entry.max_score
+            } for rank, entry in enumerate(
+                QuizLeaderboard.top(quiz_id).options(db.joinedload(QuizLeaderboard.user)), start=1
+            )]
+        }
+    
+    return jsonify(cache.get_or_set(f'quiz_leaderboard:{quiz_id}', load, ttl=QUIZ_LEADERBOARD_TTL,
+                                     tags=(f'quiz_stats:{quiz_id}',)))
+
+@quiz_bp.route('/api/quizzes/<int:quiz_id>/attempts', methods=['POST'])
+@login_required
+def quiz_submit(quiz_id):
+    """Javoblarni serverda baholash va urinishni saqlash.
+
+    So'rov: {"answers": {"<question_id>": "A", ...}, "version": 3}. version berilsa va
+    quiz o'zgargan bo'lsa 409 qaytadi. Ball EcoPoint'ga har bir quiz uchun kuniga bir marta yoziladi.
+    """
+    payload = request.get_json(silent=True)
+    answers = payload.get('answers') if isinstance(payload, dict) else None
+    if not isinstance(answers, dict):
+        return jsonify({'success': False, 'message': 'answers obyekti kerak'}), 400
+    try:
+        answers = {int(question_id): str(letter).strip().upper() for question_id, letter in answers.items()}
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'Savol id raqam bo\'lishi kerak'}), 400
+    
+    quiz = db.session.execute(
+        db.select(Quiz.version, Quiz.is_active, Quiz.title).where(Quiz.id == quiz_id)
+    ).first()
+    if quiz is None or not quiz.is_active:
+        return jsonify({'success': False, 'message': 'Quiz topilmadi'}), 404
+    if payload.get('version') is not None and payload.get('version') != quiz.version:
+        return jsonify({'success': False, 'message': 'Quiz yangilandi, qayta yuklang'}), 409
+    
+    # Kalit keshdan; baholash xotirada, yozuvlardan oldin - tranzaksiya qisqa bo'ladi
+    key = Quiz.answer_key(quiz_id, quiz.version)
+    if not key:
+        return jsonify({'success': False, 'message': 'Quizda savollar yo\'q'}), 400
+    score, mask = Quiz.grade(key, answers)
+    max_score = sum(points for _, _, points in key)
+    
+    try:
+        attempt = QuizAttempt(
+            user_id=current_user.id,
+            quiz_id=quiz_id,
+            quiz_version=quiz.version,
+            score=score,
+            max_score=max_score,
+            correct_mask=QuizAttempt.pack_mask(mask, len(key)),
+            question_count=len(key)
+        )
+        db.session.add(attempt)
+        db.session.flush()
+        attempt_id = attempt.id
+        QuizStats.record_attempt(quiz_id, current_user.id, score, max_score, key, mask)
+        
+        points_awarded = 0
+        total_points = None
+        badges_earned = []
+        if score:
+            today = datetime.now().date()
+            task_type = f'quiz_{quiz_id}'
+            inserted = db.session.execute(
+                insert_or_ignore(db.session, EcoPoint).values(
+                    user_id=current_user.id,
+                    date=today,
+                    points=score,
+                    task_type=task_type,
+                    description=f'Quiz: {quiz.title}'[:200]
+                )
+            ).rowcount
+            if inserted:
+                points_awarded = score
+                total_points = UserStats.record_task(current_user.id, score, today)
+                DailyRollup.record([(today, current_user.id, task_type, {'points': score, 'task_count': 1})])
+                if len(catalog.reached_badges(total_points)) > len(catalog.reached_badges(total_points - score)):
+                    badges_earned = Badge.assign_badge(current_user.id, total_points)
+        db.session.commit()
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': 'Xatolik yuz berdi. Iltimos, qayta urinib ko\'ring.'}), 500
+    
+    cache.invalidate_tags(f'quiz_stats:{quiz_id}')
+    if points_awarded:
+        cache.invalidate_tags(f'user:{current_user.id}')
+    
+    return jsonify({
+        'success': True,
+        'attempt_id': attempt_id,
+        'score': score,
+        'max_score': max_score,
+        'correct': [question_id for index, (question_id, _, _) in enumerate(key) if mask >> index & 1],
+        'points_awarded': points_awarded,
+        'total_points': total_points,
+        'badges_earned': badges_earned
+    })
+
+@quiz_bp.route('/admin/quizzes')
+@login_required
+def admin_quizzes():
+    """Quizlarni boshqarish sahifasi"""
+    if not current_user.is_admin:
+        flash('Sizda admin huquqi yo\'q', 'error')
+        return redirect(url_for('index'))
+    
+    page = keyset_paginate(
+        Quiz.query,
+        Quiz.created_at, Quiz.id,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=ADMIN_PAGE_SIZE
+    )
+    page.total = approximate_count('Quiz', Quiz.query)
+    return render_template('admin/admin_quizzes.html', quizzes=page.items, page=page)
+
+@quiz_bp.route('/admin/quiz/add', methods=['GET', 'POST'])
+@login_required
+def admin_quiz_add():
+    """Yangi quiz qo'shish"""
+    if not current_user.is_admin:
+        flash('Sizda admin huquqi yo\'q', 'error')
+        return redirect(url_for('index'))
+    
+    if request.method == 'POST':
+        try:
+            title = request.form.get('title')
+            description = request.form.get('description')
+            
+            if not title:
+                flash('Quiz nomini kiriting', 'error')
+                return redirect(url_for('.admin_quiz_add'))
+            
+            quiz = Quiz(title=title, description=description)
+            db.session.add(quiz)
+            db.session.commit()
+            cache.invalidate_tags('quizzes')
+            
+            flash('Quiz muvaffaqiyatli qo\'shildi!', 'success')
+            return redirect(url_for('.admin_quizzes'))
+            
+        except Exception as e:
+            db.session.rollback()
+            flash('Quiz qo\'shishda xatolik yuz berdi', 'error')
+            return redirect(url_for('.admin_quiz_add'))
+    
+    return render_template('admin/admin_quiz_add.html')
+
+@quiz_bp.route('/admin/quiz/<int:quiz_id>/questions')
+@login_required
+def admin_quiz_questions(quiz_id):
+    """Quiz savollarini boshqarish"""
+    if not current_user.is_admin:
+        flash('Sizda admin huquqi yo\'q', 'error')
+        return redirect(url_for('index'))
+    
+    quiz = Quiz.query.get_or_404(quiz_id)
+    # Statistika yig'ma jadvallardan: O(savollar + QUIZ_LEADERBOARD_SIZE), urinishlar soniga bog'liq emas
+    stats = db.session.get(QuizStats, quiz_id)
+    question_stats = {
+        row.question_id: row for row in QuizQuestionStats.query.filter_by(quiz_id=quiz_id)
+    }
+    leaderboard = QuizLeaderboard.top(quiz_id).options(db.joinedload(QuizLeaderboard.user)).all()
+    return render_template('admin/admin_quiz_edit.html', quiz=quiz, stats=stats,
+                           question_stats=question_stats, leaderboard=leaderboard)
+
+def parse_import_rows(raw, fmt):
+    """CSV (sarlavha qatori bilan) yoki JSON ro'yxatni lug'atlar ro'yxatiga aylantirish; xato bo'lsa matn"""
+    if fmt == 'json':
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return 'JSON noto\'g\'ri formatda'
+        rows = data.get('questions') if isinstance(data, dict) else data
+        if not isinstance(rows, list):
+            return 'JSON savollar ro\'yxati bo\'lishi kerak'
+        return rows
+    
+    reader = csv.DictReader(io.StringIO(raw))
+    missing = {'question_text', 'option_a', 'option_b', 'correct_answer'} - set(reader.fieldnames or ())
+    if missing:
+        return f"CSV sarlavhasida ustunlar yo'q: {', '.join(sorted(missing))}"
+    return list(reader)
+
+def validate_question_row(row, quiz_id):
+    """Import qatorini tekshirish; QuizQuestion ustunlari lug'ati yoki xato matnini qaytaradi"""
+    if not isinstance(row, dict):
+        return 'Qator obyekt bo\'lishi kerak'
+    
+    # Faqat yo'q/None qiymat bo'sh hisoblanadi - JSON'dagi 0 yoki false tekshiruvdan o'tmasligi kerak
+    values = {
+        field: '' if row.get(field) is None else str(row.get(field)).strip()
+        for field in QUIZ_IMPORT_FIELDS
+    }
+    if not values['question_text']:
+        return 'question_text bo\'sh'
+    if not values['option_a'] or not values['option_b']:
+        return 'A va B variantlari majburiy'
+    for field in ('option_a', 'option_b', 'option_c', 'option_d'):
+        if len(values[field]) > 200:
+            return f'{field} 200 belgidan uzun'
+    
+    correct_answer = values['correct_answer'].upper()
+    if correct_answer not in ('A', 'B', 'C', 'D'):
+        return 'correct_answer A, B, C yoki D bo\'lishi kerak'
+    if not values[f'option_{correct_answer.lower()}']:
+        return f'To\'g\'ri javob ({correct_answer}) varianti bo\'sh'
+    
+    try:
+        points = int(values['points'] or 1)
+    except ValueError:
+        return 'points butun son bo\'lishi kerak'
+    if points < 1:
+        return 'points kamida 1 bo\'lishi kerak'
+    
+    return {
+        'quiz_id': quiz_id,
+        'question_text': values['question_text'],
+        'option_a': values['option_a'],
+        'option_b': values['option_b'],
+        'option_c': values['option_c'] or None,
+        'option_d': values['option_d'] or None,
+        'correct_answer': correct_answer,
+        'points': points
+    }
+
+@quiz_bp.route('/admin/quiz/<int:quiz_id>/questions/import', methods=['POST'])
+@login_required
+def admin_questions_import(quiz_id):
+    """Savollarni CSV yoki JSON'dan ommaviy import qilish.
+
+    Fayl (forma, `file`) yoki so'rov tanasi (application/json, text/csv) qabul qilinadi.
+    Avval barcha qatorlar tekshiriladi - bitta xato bo'lsa hech narsa yozilmaydi;
+    aks holda hammasi bitta tranzaksiyada bitta executemany INSERT bilan qo'shiladi.
+    """
+    upload = request.files.get('file')
+    
+    def respond(success, message, status=200, **extra):
+        if upload is None:
+            return jsonify({'success': success, 'message': message, **extra}), status
+        flash(message, 'success' if success else 'error')
+        for error in extra.get('errors', [])[:10]:
+            flash(f"{error['row']}-qator: {error['message']}", 'error')
+        return redirect(url_for('.admin_quiz_questions', quiz_id=quiz_id))
+    
+    if not current_user.is_admin:
+        return respond(False, 'Sizda admin huquqi yo\'q', 403)
+    if db.session.get(Quiz, quiz_id) is None:
+        return respond(False, 'Quiz topilmadi', 404)
+    
+    if upload is not None:
+        raw = upload.read().decode('utf-8-sig', errors='replace')
+        fmt = 'json' if upload.filename.lower().endswith('.json') else 'csv'
+    else:
+        raw = request.get_data(as_text=True)
+        fmt = 'json' if request.is_json else 'csv'
+    
+    rows = parse_import_rows(raw, fmt)
+    if isinstance(rows, str):
+        return respond(False, rows, 400)
+    if not rows:
+        return respond(False, 'Import uchun savollar yo\'q', 400)
+    if len(rows) > QUIZ_IMPORT_MAX_ROWS:
+        return respond(False, f'Bir importda ko\'pi bilan {QUIZ_IMPORT_MAX_ROWS} ta savol', 413)
+    
+    questions = []
+    errors = []
+    for number, row in enumerate(rows, start=1):
+        parsed = validate_question_row(row, quiz_id)
+        if isinstance(parsed, str):
+            errors.append({'row': number, 'message': parsed})
+        else:
+            questions.append(parsed)
+    if errors:
+        return respond(False, f'{len(errors)} ta qatorda xato, hech narsa import qilinmadi', 400, errors=errors)
+    
+    try:
+        db.session.execute(db.insert(QuizQuestion), questions)
+        Quiz.bump_version(quiz_id)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return respond(False, 'Importda xatolik yuz berdi', 500)
+    
+    cache.invalidate_tags('quizzes')
+    return respond(True, f'{len(questions)} ta savol import qilindi', imported=len(questions))
+
+@quiz_bp.route('/admin/quiz/<int:quiz_id>/question/add', methods=['POST'])
+@login_required
+def admin_question_add(quiz_id):
+    """Quizga yangi savol qo'shish"""
+    if not current_user.is_admin:
+        flash('Sizda admin huquqi yo\'q', 'error')
+        return redirect(url_for('index'))
+    
+    try:
+        question_text = request.form.get('question_text')
+        option_a = request.form.get('option_a')
+        option_b = request.form.get('option_b')
+        option_c = request.form.get('option_c')
+        option_d = request.form.get('option_d')
+        correct_answer = request.form.get('correct_answer')
+        points = request.form.get('points', 1, type=int)
+        
+        if not all([question_text, option_a, option_b, correct_answer]):
+            flash('Barcha kerakli maydonlarni to\'ldiring', 'error')
+            return redirect(url_for('.admin_quiz_questions', quiz_id=quiz_id))
+        
+        question = QuizQuestion(
+            quiz_id=quiz_id,
+            question_text=question_text,
+            option_a=option_a,
+            option_b=option_b,
+            option_c=option_c,
+            option_d=option_d,
+            correct_answer=correct_answer,
+            points=points
+        )
+        
+        db.session.add(question)
+        Quiz.bump_version(quiz_id)
+        db.session.commit()
+        cache.invalidate_tags('quizzes')
+        
+        flash('Savol muvaffaqiyatli qo\'shildi!', 'success')
+        return redirect(url_for('.admin_quiz_questions', quiz_id=quiz_id))
+        
+    except Exception as e:
+        db.session.rollback()
+        flash('Savol qo\'shishda xatolik yuz berdi', 'error')
+        return redirect(url_for('.admin_quiz_questions', quiz_id=quiz_id))
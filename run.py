@@ -3,7 +3,7 @@
 EcoTrack ilovasini ishga tushirish fayli
 """
 
-from app import app, init_db
+from app import create_app, init_db
 
 if __name__ == '__main__':
     print("🌿 EcoTrack ilovasi ishga tushmoqda...")
@@ -11,7 +11,9 @@ if __name__ == '__main__':
     print("⏹ To'xtatish uchun Ctrl+C tugmasini bosing")
     
     try:
-        init_db()
+        app = create_app()
+        with app.app_context():
+            init_db()
         app.run(debug=True, host='0.0.0.0', port=5000)
     except KeyboardInterrupt:
         print("\n👋 EcoTrack ilovasi to'xtatildi!")
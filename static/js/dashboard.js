@@ -9,8 +9,7 @@ function completeTask(taskId, points) {
             'Content-Type': 'application/json',
         },
         body: JSON.stringify({
-            task_id: taskId,
-            points: points
+            task_id: taskId
         })
     })
     .then(response => response.json())
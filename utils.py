@@ -1,21 +1,27 @@
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, date
+import base64
+import json
 import random
 
+from sqlalchemy import event, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+
+from cache import cache
+from catalog import catalog
+
 def calculate_user_level(total_points):
     """Foydalanuvchi darajasini hisoblash"""
-    return total_points // 100
+    return catalog.level(total_points)
 
 def get_next_level_points(total_points):
     """Keyingi darajaga qancha ball qolganligini hisoblash"""
-    current_level = calculate_user_level(total_points)
-    next_level_points = (current_level + 1) * 100
-    return next_level_points - total_points
+    return catalog.next_level_points(total_points)
 
 def get_progress_percentage(total_points):
     """Progress foizini hisoblash"""
-    level_points = total_points % 100
-    return level_points
+    return catalog.level_progress(total_points)
 
 def format_date(dt):
     """Sana formatlash"""
@@ -23,33 +29,14 @@ def format_date(dt):
 
 def get_daily_tasks():
     """Kunlik topshiriqlar ro'yxati"""
-    return [
-        {"id": 1, "name": "Plastikdan foydalanmang", "points": 10, "icon": "🚫"},
-        {"id": 2, "name": "Suvni tejang", "points": 15, "icon": "💧"},
-        {"id": 3, "name": "Eneriyani tejang", "points": 12, "icon": "⚡"},
-        {"id": 4, "name": "Qayta ishlang", "points": 20, "icon": "♻️"},
-        {"id": 5, "name": "O'simlik ekish", "points": 25, "icon": "🌱"}
-    ]
+    return catalog.tasks
 
 def get_badge_info(total_points):
     """Foydalanuvchi badge ma'lumotlari"""
-    badges = [
-        {"points": 0, "name": "Boshlovchi", "description": "Yo'l boshida"},
-        {"points": 50, "name": "Green Starter", "description": "Yashil yo'l boshlovchisi"},
-        {"points": 100, "name": "Eco Friend", "description": "Tabiat do'sti"},
-        {"points": 200, "name": "Nature Guardian", "description": "Tabiat himoyachisi"},
-        {"points": 500, "name": "Planet Hero", "description": "Sayyora qahramoni"},
-        {"points": 1000, "name": "Eco Master", "description": "Ekologiya ustasi"}
-    ]
-    
-    current_badge = badges[0]
-    next_badge = badges[1]
-    
-    for i, badge in enumerate(badges):
-        if total_points >= badge['points']:
-            current_badge = badge
-            if i + 1 < len(badges):
-                next_badge = badges[i + 1]
+    current_badge = catalog.current_badge(total_points)
+    next_badge = catalog.next_badge(total_points)
+    if next_badge['points'] <= current_badge['points']:
+        next_badge = current_badge
     
     return {
         'current': current_badge,
@@ -93,4 +80,131 @@ def get_environmental_impact(points):
         'co2_saved': co2_saved,
         'trees_equivalent': trees_equivalent,
         'km_driven_equivalent': km_driven_equivalent
-    }
\ No newline at end of file
+    }
+def insert_or_ignore(session, model):
+    """Unique cheklovga urilgan qatorlarni jimgina tashlab yuboruvchi INSERT (SQLite, PostgreSQL)"""
+    dialect = session.get_bind().dialect.name
+    
+    insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+    return insert(model).on_conflict_do_nothing()
+
+# ===== KEYSET PAGINATION =====
+COUNT_CACHE_TTL = 60
+# Admin ro'yxat sahifalari o'lchami (admin va quiz blueprint'lari)
+ADMIN_PAGE_SIZE = 50
+
+def encode_cursor(sort_value, row_id):
+    """(sort_value, id) juftligini URL uchun xavfsiz kursorga aylantirish"""
+    raw = json.dumps([sort_value.isoformat(), row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, column):
+    """Kursorni (sort_value, id) ga qaytarish; noto'g'ri kursor uchun None"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        value_type = datetime if column.type.python_type is datetime else date
+        return value_type.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError):
+        return None
+
+class KeysetPage:
+    """Kursorli sahifa: items, next_cursor/prev_cursor va taxminiy jami"""
+    def __init__(self, items, next_cursor=None, prev_cursor=None, total=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+    
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+    
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+    
+    def __iter__(self):
+        return iter(self.items)
+    
+    def __len__(self):
+        return len(self.items)
+
+def keyset_paginate(query, sort_column, id_column, after=None, before=None, per_page=20):
+    """(sort_column, id) bo'yicha yangidan eskiga kursorli sahifalash.
+
+    OFFSET ishlatilmaydi - har bir sahifa indeks bo'yicha birinchi sahifa
+    kabi arzon. after - keyingi (eskiroq) sahifa, before - oldingi sahifa.
+    """
+    key = tuple_(sort_column, id_column)
+    query = query.order_by(None)
+    after = decode_cursor(after, sort_column) if after else None
+    before = decode_cursor(before, sort_column) if before else None
+    
+    if before:
+        query = query.filter(key > tuple_(*before))\
+            .order_by(sort_column.asc(), id_column.asc())
+    else:
+        if after:
+            query = query.filter(key < tuple_(*after))
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    
+    items = query.limit(per_page + 1).all()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+    if before:
+        items.reverse()
+    
+    has_next = True if before else has_more
+    has_prev = has_more if before else after is not None
+    
+    def cursor(item):
+        return encode_cursor(getattr(item, sort_column.key), getattr(item, id_column.key))
+    
+    return KeysetPage(
+        items,
+        next_cursor=cursor(items[-1]) if items and has_next else None,
+        prev_cursor=cursor(items[0]) if items and has_prev else None
+    )
+
+def approximate_count(key, query, ttl=COUNT_CACHE_TTL):
+    """COUNT(*) natijasini qisqa muddat keshlash (sahifalash uchun taxminiy jami)"""
+    return cache.get_or_set(f'count:{key}', query.order_by(None).count, ttl=ttl)
+
+def upsert_increment(bind, model, index_elements, counters):
+    """Mavjud qatorda counters ustunlariga qo'shuvchi, yo'q bo'lsa yaratuvchi INSERT (SQLite, PostgreSQL).
+
+    bind - session yoki connection.
+    """
+    dialect = (bind.get_bind() if hasattr(bind, 'get_bind') else bind).dialect.name
+    table = model.__table__
+    
+    insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+    stmt = insert(model)
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={name: table.c[name] + stmt.excluded[name] for name in counters}
+    )
+
+# ===== SQLITE SOZLAMALARI =====
+POOL_SIZE_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout')
+
+def engine_options_for(uri, options):
+    """Engine parametrlari: xotiradagi SQLite (StaticPool) pul o'lchami parametrlarini qabul qilmaydi"""
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return {name: value for name, value in options.items() if name not in POOL_SIZE_OPTIONS}
+    return options
+
+def set_sqlite_pragmas(engine, pragmas):
+    """Har bir yangi SQLite ulanishida PRAGMA'larni o'rnatish (boshqa dialektlarda hech narsa qilmaydi)"""
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            if value is not None:
+                cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
@@ -0,0 +1,8 @@
+"""
+Production WSGI kirish nuqtasi: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from app import create_app
+from config import ProductionConfig
+
+app = create_app(ProductionConfig)